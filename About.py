@@ -1,6 +1,11 @@
 import streamlit as st
 
+from lca.warmup import start_warmup
+from lca.watcher import start_watcher
+
 st.set_page_config(page_title="LCA Dashboard", layout="wide")
+start_watcher()
+start_warmup()
 
 # --- Combined Thesis Header, Dashboard Purpose, Structure, Contact ---
 st.markdown("""
@@ -0,0 +1,72 @@
+"""Cold-start time to first chart, one fresh server process per measurement.
+
+    python -m benchmarks.cold_start --think 0 2
+
+Each page is opened in a new process, either as the very first request or
+after a visit to About.py followed by ``--think`` seconds of reading, which
+is when the warm-up overlaps with the visitor. Reported, in seconds from the
+first request: when the warm-up had the data ready, when the first chart was
+rendered, and when the page script finished. The on-disk Parquet cache of
+master.xlsx is used as in production; delete ``.cache`` for a first-ever start.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from benchmarks.common import PAGES
+
+
+def _visit(page, think):
+    from streamlit.testing.v1 import AppTest
+
+    from lca.warmup import warmup_status
+
+    start = time.perf_counter()
+    if think is not None:
+        AppTest.from_file(os.path.abspath("About.py"), default_timeout=600).run()
+        time.sleep(think)
+    visit = time.perf_counter()
+    at = AppTest.from_file(os.path.abspath(page), default_timeout=600).run()
+    done = time.perf_counter()
+    status = warmup_status()
+    offset = status["started"] - start if status["started"] is not None else 0.0
+    return {
+        "ready_s": None if status["ready_s"] is None else status["ready_s"] + offset,
+        "first_chart_s": None if status["first_chart_s"] is None else status["first_chart_s"] + offset,
+        "page_s": done - start,
+        "page_after_click_s": done - visit,
+        "errors": len(at.exception),
+    }
+
+
+def run(pages=PAGES, thinks=(None,)):
+    rows = []
+    context = multiprocessing.get_context("spawn")
+    for think in thinks:
+        for page in pages:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(_visit, page, think).result()
+            rows.append({
+                "page": os.path.basename(page)[:-3],
+                "first_request": "page" if think is None else f"About + {think:g} s",
+                **result,
+            })
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--think", type=float, nargs="*", default=[],
+                        help="also open About.py first and wait this many seconds")
+    args = parser.parse_args(argv)
+    result = run(args.pages, [None, *args.think])
+    print(result.to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
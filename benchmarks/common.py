@@ -0,0 +1,24 @@
+"""Pieces shared by the benchmark scripts."""
+import glob
+import os
+
+import pandas as pd
+
+# the dashboard page scripts, in sidebar order
+PAGES = sorted(glob.glob(os.path.join("pages", "[0-9]*.py")))
+
+
+def compare(baseline, results, threshold, min_delta_ms=5.0, key=("page",), value="wall_ms_min"):
+    """Frame of current vs baseline ``value`` per ``key``; ``regressed`` marks the slow ones.
+
+    Cases that got slower by less than ``min_delta_ms`` are never flagged, so
+    timer noise on millisecond-sized cases does not fail a comparison.
+    """
+    key = list(key)
+    before = pd.DataFrame(baseline["results"]).set_index(key)[value]
+    after = pd.DataFrame(results).set_index(key)[value]
+    frame = pd.concat([before.rename("baseline_ms"), after.rename("current_ms")], axis=1, join="inner")
+    frame["ratio"] = frame["current_ms"] / frame["baseline_ms"]
+    delta = frame["current_ms"] - frame["baseline_ms"]
+    frame["regressed"] = (frame["ratio"] > threshold) & (delta > min_delta_ms)
+    return frame.reset_index()
@@ -0,0 +1,74 @@
+"""Compare heatmap figure build time and JSON payload size per label mode.
+
+    python -m benchmarks.heatmap_render --repeat 3 --scale 1 2
+
+Building the annotation figure grows quadratically with the number of cells
+(every ``add_annotation`` copies the layout's annotation tuple), so large
+scales take minutes in that mode.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from lca.aggregation import variant_totals
+from lca.data_loader import MASTER_PATH, load_master
+from lca.figures import HEATMAP_MODES, build_heatmap_figure
+from lca.heatmap import relative_impacts, top_processes
+from lca.variants import load_variant_map
+
+
+def heatmap_inputs(path=MASTER_PATH, scale=1):
+    """Heatmap inputs for the shipped data, tiled ``scale`` times per axis."""
+    df = load_master(path)
+    variant_map = load_variant_map()
+    norm_df = relative_impacts(variant_totals(df, variant_map)).loc[::-1]
+    top_df = top_processes(df, variant_map)
+    if scale > 1:
+        norm_df = pd.DataFrame(
+            np.tile(norm_df.to_numpy(), (scale, scale)),
+            index=[f"{name} #{k}" for k in range(scale) for name in norm_df.index],
+            columns=[f"{name} #{k}" for k in range(scale) for name in norm_df.columns],
+        )
+        top_df = pd.DataFrame(np.tile(top_df.to_numpy(), (scale, scale)),
+                              index=norm_df.index[::-1], columns=norm_df.columns)
+    return norm_df, top_df
+
+
+def run(repeat=3, scales=(1,), path=MASTER_PATH):
+    rows = []
+    for scale in scales:
+        norm_df, top_df = heatmap_inputs(path, scale)
+        for mode in HEATMAP_MODES:
+            build, serialize = [], []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fig = build_heatmap_figure(norm_df, top_df, mode=mode)
+                build.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                payload = fig.to_json()
+                serialize.append(time.perf_counter() - start)
+            rows.append({
+                "scale": scale,
+                "cells": norm_df.size,
+                "mode": mode,
+                "build_ms": 1000 * min(build),
+                "to_json_ms": 1000 * min(serialize),
+                "payload_kb": len(payload.encode("utf-8")) / 1024,
+            })
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--master", default=MASTER_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1],
+                        help="tile the variant and impact axes this many times")
+    args = parser.parse_args(argv)
+    print(run(args.repeat, args.scale, args.master).to_string(index=False, float_format="%.1f"))
+
+
+if __name__ == "__main__":
+    main()
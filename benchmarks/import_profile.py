@@ -0,0 +1,91 @@
+"""Import-time profile of every dashboard page.
+
+    python -m benchmarks.import_profile --output imports.json
+    python -m benchmarks.import_profile --compare imports.json
+
+Each page's top-level imports are run in a fresh interpreter under
+``python -X importtime``, after Streamlit, pandas and NumPy, which the
+server has loaded before any page runs. Reported per page: the total import
+time and the heaviest top-level modules. Plotting libraries imported inside
+figure builders are not counted; they load on the first figure-cache miss.
+``--output`` and ``--compare`` work as in ``benchmarks.pages``.
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pandas as pd
+
+from benchmarks.common import PAGES, compare
+
+PRELOADED = "import streamlit, pandas, numpy"
+_MARK = "--- page imports ---"
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def page_imports(path):
+    """Source of the module-level import statements of ``path``."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def profile(path):
+    """``{module: cumulative_us}`` for the modules first imported by ``path``."""
+    code = f"{PRELOADED}\nimport sys\nsys.stderr.write({_MARK!r} + '\\n')\n{page_imports(path)}"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, env=env, check=True)
+    modules = {}
+    for line in result.stderr.split(_MARK, 1)[1].splitlines():
+        match = _LINE.match(line)
+        if match and len(match.group(3)) == 1:  # top level of the import tree
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def run(pages=PAGES, top=5):
+    rows = []
+    for page in pages:
+        modules = profile(page)
+        heaviest = sorted(modules.items(), key=lambda item: -item[1])[:top]
+        rows.append({
+            "page": os.path.basename(page)[:-3],
+            "import_ms": sum(modules.values()) / 1000,
+            "heaviest": ", ".join(f"{name} {us / 1000:.1f}" for name, us in heaviest),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--top", type=int, default=5, help="heaviest modules listed per page")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="flag pages slower than baseline x threshold")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    results = run(args.pages, args.top)
+    with pd.option_context("display.max_colwidth", None):
+        print(pd.DataFrame(results).to_string(index=False, float_format="%.1f"))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            frame = compare(json.load(f), results, args.threshold, args.min_delta_ms, value="import_ms")
+        print(frame.to_string(index=False, float_format="%.2f"))
+        if frame["regressed"].any():
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Time the compute path behind every dashboard page.
+
+    python -m benchmarks.pages --rows 100000 1000000 --output bench.json
+    python -m benchmarks.pages --compare bench.json
+
+Each page's computation is run uncached on the shipped master.xlsx and on
+synthetic tables of ``--rows`` rows (see ``lca.synthetic``), recording the
+best and median wall time over ``--repeat`` runs and the peak traced Python
+and NumPy allocation of one extra run. ``--output`` writes the results as
+JSON with the commit and library versions; ``--compare`` re-runs the same
+cases and fails when any case is slower than the baseline by more than
+``--threshold``. The Prospective case builds the page's trajectories on
+every year grid from the shipped scenario CSVs, whose variants do not
+depend on the inventory, so it only runs on the shipped master.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import compare
+from lca.aggregation import variant_counts, variant_group_totals, variant_totals
+from lca.contribution import group_contribution, process_groups
+from lca.data_loader import MASTER_PATH, load_master
+from lca.heatmap import relative_impacts, top_processes
+from lca.monetization import LEVELS, cube_costs, match_columns, monetization_cube
+from lca.prospective import YEAR_STEPS, build_prospective_store
+from lca.scenarios import SCENARIO_FILES, build_scenario_store, line_series
+from lca.synthetic import synthetic_master
+from lca.variants import load_variant_map
+
+
+def overview(df, variant_map):
+    return variant_totals(df, variant_map)
+
+
+def monetization(df, variant_map):
+    mapping = match_columns(df.columns)["mapping"]
+    cube = monetization_cube(variant_totals(df, variant_map), variant_counts(df, variant_map),
+                             variant_map, mapping)
+    return [cube_costs(cube, level, adjusted) for level in LEVELS for adjusted in (False, True)]
+
+
+def contribution(df, variant_map):
+    return group_contribution(variant_group_totals(df, variant_map, process_groups(df)))
+
+
+def heatmap(df, variant_map):
+    return top_processes(df, variant_map), relative_impacts(variant_totals(df, variant_map))
+
+
+def prospective(df, variant_map):
+    scenario_store = build_scenario_store(SCENARIO_FILES)
+    group_totals = variant_group_totals(df, variant_map, process_groups(df))
+    stores = [build_prospective_store(scenario_store, group_totals, step) for step in YEAR_STEPS]
+    return [line_series(store, store["scenarios"], store["variants"]) for store in stores]
+
+
+PAGES = {
+    "overview": overview,
+    "monetization": monetization,
+    "contribution": contribution,
+    "heatmap": heatmap,
+    "prospective": prospective,
+}
+SCALED_PAGES = ["overview", "monetization", "contribution", "heatmap"]
+
+
+def measure(func, args, repeat):
+    """``(wall times in ms, peak traced MB)`` of ``func(*args)``."""
+    gc.collect()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(1000 * (time.perf_counter() - start))
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return times, peak / 2**20
+
+
+def datasets(path, sizes, seed=0):
+    template = load_master(path)
+    yield "shipped", template
+    for rows in sizes:
+        yield f"synthetic-{rows}", synthetic_master(rows, template, seed)
+
+
+def run(sizes=(), repeat=5, pages=tuple(PAGES), path=MASTER_PATH):
+    variant_map = load_variant_map()
+    results = []
+    for dataset, df in datasets(path, sizes):
+        for page in pages:
+            if dataset != "shipped" and page not in SCALED_PAGES:
+                continue
+            times, peak_mb = measure(PAGES[page], (df, variant_map), repeat)
+            results.append({
+                "page": page,
+                "dataset": dataset,
+                "rows": len(df),
+                "wall_ms_min": min(times),
+                "wall_ms_median": statistics.median(times),
+                "peak_mb": peak_mb,
+            })
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--master", default=MASTER_PATH)
+    parser.add_argument("--rows", type=int, nargs="*", default=[],
+                        help="sizes of the synthetic tables to add")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        sizes = sorted({r["rows"] for r in baseline["results"] if r["dataset"] != "shipped"})
+        pages = [p for p in PAGES if any(r["page"] == p for r in baseline["results"])]
+    else:
+        sizes, pages = args.rows, args.pages
+
+    results = run(sizes, args.repeat, pages, args.master)
+    print(pd.DataFrame(results).to_string(index=False, float_format="%.2f"))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+    if baseline is not None:
+        frame = compare(baseline, results, args.threshold, args.min_delta_ms, key=["page", "dataset"])
+        print()
+        print(frame.to_string(index=False, float_format="%.2f"))
+        if frame["regressed"].any():
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Check that the prospective engine interpolates ragged scenario CSVs.
+
+    python -m benchmarks.prospective_check --step 0.25
+
+Copies the shipped scenario CSVs to a temporary directory and blanks one
+inner anchor of every variant in the first file (a different year per
+variant). Each interpolated series must stay finite, reproduce its
+remaining anchors and match ``np.interp`` over them; the untouched files
+must match the full-CSV result. Exits with status 1 when a check fails.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from lca.prospective import YEAR_STEPS, iam_trajectories, year_grid
+from lca.scenarios import SCENARIO_FILES, build_scenario_store
+
+
+def ragged_copy(paths, directory):
+    """Copies of ``paths`` in ``directory``, one inner anchor per variant blanked in the first."""
+    copies = []
+    for i, path in enumerate(paths):
+        df = pd.read_csv(path)
+        if i == 0:
+            inner = df.index[1:-1]
+            for j, column in enumerate(c for c in df.columns if c != "Year"):
+                df.loc[inner[j % len(inner)], column] = np.nan
+        copy = os.path.join(directory, os.path.basename(path))
+        df.to_csv(copy, index=False)
+        copies.append(copy)
+    return copies
+
+
+def run(step=1, paths=SCENARIO_FILES):
+    years = year_grid(step)
+    full = build_scenario_store(paths)
+    with tempfile.TemporaryDirectory() as directory:
+        ragged = build_scenario_store(ragged_copy(paths, directory))
+    expected = iam_trajectories(full, years)
+    result = iam_trajectories(ragged, years)
+
+    anchors = ragged["years"].astype(np.float64)
+    values = ragged["values"][0]
+    known = np.isfinite(values)
+    reference = np.column_stack([
+        np.interp(years, anchors[known[:, v]], values[known[:, v], v])
+        for v in range(values.shape[1])
+    ])
+    anchor_rows = np.searchsorted(years, anchors)
+    return {
+        "blanked": int((~known).sum()),
+        "finite": bool(np.isfinite(result).all()),
+        "anchors_kept": bool(np.allclose(result[0][anchor_rows][known], values[known])),
+        "matches_interp": bool(np.allclose(result[0], reference)),
+        "others_unchanged": bool(np.allclose(result[1:], expected[1:])),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--step", type=float, default=1, choices=YEAR_STEPS)
+    args = parser.parse_args(argv)
+    result = run(args.step)
+    for name, value in result.items():
+        print(f"{name}: {value}")
+    if not all(value for name, value in result.items() if name != "blanked"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
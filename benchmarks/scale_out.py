@@ -0,0 +1,76 @@
+"""Time the out-of-core aggregations on synthetic Parquet inventories.
+
+    python -m benchmarks.scale_out --rows 10000 1000000 10000000
+
+Each size is written once to ``.cache/synthetic-<rows>.parquet`` and then
+scanned in a fresh worker process, so ``peak_rss_mb`` is that scan's own
+high-water mark (Linux/macOS only) and stays flat as the row count grows.
+"""
+import argparse
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from lca.data_loader import CACHE_DIR
+from lca.out_of_core import DEFAULT_CHUNK_ROWS, scan_master
+from lca.synthetic import DEFAULT_PROCESS_VARIANTS, write_synthetic_parquet
+
+
+def synthetic_path(rows, process_variants=DEFAULT_PROCESS_VARIANTS):
+    return os.path.join(CACHE_DIR, f"synthetic-{rows}-{process_variants}.parquet")
+
+
+def ensure_synthetic(rows, process_variants=DEFAULT_PROCESS_VARIANTS):
+    """Path of the synthetic table with ``rows`` rows, generated if missing."""
+    path = synthetic_path(rows, process_variants)
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        write_synthetic_parquet(path + ".tmp", rows, process_variants=process_variants)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def _scan(path, chunk_rows):
+    start = time.perf_counter()
+    result = scan_master(path, chunk_rows=chunk_rows)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, peak_kb, result["chunks"], len(result["group_totals"])
+
+
+def run(sizes, chunk_rows=DEFAULT_CHUNK_ROWS, process_variants=DEFAULT_PROCESS_VARIANTS):
+    rows = []
+    for size in sizes:
+        start = time.perf_counter()
+        path = ensure_synthetic(size, process_variants)
+        prepare = time.perf_counter() - start
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            elapsed, peak_kb, chunks, groups = pool.submit(_scan, path, chunk_rows).result()
+        rows.append({
+            "rows": size,
+            "chunks": chunks,
+            "file_mb": os.path.getsize(path) / 2**20,
+            "prepare_s": prepare,
+            "scan_s": elapsed,
+            "rows_per_s": size / elapsed,
+            "peak_rss_mb": peak_kb / 1024,
+        })
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--process-variants", type=int, default=DEFAULT_PROCESS_VARIANTS,
+                        help="numbered copies of each template process")
+    args = parser.parse_args(argv)
+    result = run(args.rows, args.chunk_rows, args.process_variants)
+    print(result.to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
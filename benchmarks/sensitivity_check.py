@@ -0,0 +1,59 @@
+"""Check the Sobol estimates against the closed-form shares of the cost model.
+
+    python -m benchmarks.sensitivity_check --samples 8192 32768
+
+The monetized cost is linear in independent factors, so S1 and ST of every
+variant and category equal ``lca.sensitivity.linear_shares``. For each
+sample size this prints the largest absolute error of S1 and ST and the
+range of the per-variant S1 sums (which should be close to 1), and exits
+with status 1 when an error exceeds ``--tolerance``.
+"""
+import argparse
+import sys
+
+import pandas as pd
+
+from lca.aggregation import load_variant_counts, load_variant_totals
+from lca.data_loader import load_master
+from lca.monetization import load_column_mapping
+from lca.sensitivity import DEFAULT_SAMPLES, linear_shares, sensitivity_inputs, sobol_indices
+from lca.variants import load_variant_map
+
+
+def run(sizes=(DEFAULT_SAMPLES,), seed=0):
+    variant_map = load_variant_map()
+    mapping = load_column_mapping(load_master().columns)["mapping"]
+    rows = []
+    for apply_adjustment in (False, True):
+        inputs = sensitivity_inputs(load_variant_totals(variant_map), load_variant_counts(variant_map),
+                                    variant_map, mapping, apply_adjustment)
+        exact = linear_shares(inputs)
+        for samples in sizes:
+            estimate = sobol_indices(inputs, samples, seed)
+            s1_sums = estimate.groupby("Variant")["S1"].sum()
+            rows.append({
+                "co2_correction": apply_adjustment,
+                "samples": samples,
+                "s1_max_error": (estimate["S1"] - exact["S1"]).abs().max(),
+                "st_max_error": (estimate["ST"] - exact["ST"]).abs().max(),
+                "s1_sum_min": s1_sums.min(),
+                "s1_sum_max": s1_sums.max(),
+            })
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, nargs="+", default=[DEFAULT_SAMPLES])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.03,
+                        help="largest accepted absolute error of any index")
+    args = parser.parse_args(argv)
+    result = run(args.samples, args.seed)
+    print(result.to_string(index=False, float_format="%.4f"))
+    if (result[["s1_max_error", "st_max_error"]] > args.tolerance).any().any():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
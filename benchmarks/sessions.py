@@ -0,0 +1,146 @@
+"""Load test: many dashboard sessions served by one process.
+
+    python -m benchmarks.sessions --sessions 1 10 50 --rounds 2
+
+Two measurements per session count:
+
+* ``N`` Streamlit ``AppTest`` sessions are opened and kept alive, like a
+  class with the dashboard open in ``N`` tabs. Each runs every page, then
+  reruns it with another sidebar selection. ``AppTest`` cannot run scripts
+  from several threads at once, so the reruns are interleaved rather than
+  parallel. Reported: rerun latency and resident memory added per session.
+* ``N`` threads then hit the shared data layer at the same time, loading
+  what every page loads. Reported: latency under contention and how many
+  distinct master frame objects they got back (1 means one shared copy).
+"""
+import argparse
+import os
+import resource
+import statistics
+import threading
+import time
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.common import PAGES
+from lca.aggregation import load_variant_counts, load_variant_totals
+from lca.contribution import load_process_groups
+from lca.data_loader import load_master, load_master_with_hash, store_stats
+from lca.heatmap import load_top_processes
+from lca.monetization import load_monetization_cube
+from lca.prospective import YEAR_STEPS
+from lca.scenarios import load_scenario_store
+
+# selectboxes with a format_func, which AppTest can only set by value
+SELECT_VALUES = {"year_step": YEAR_STEPS}
+
+
+def rss_mb():
+    """Current resident set size, or the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def p95(values):
+    return statistics.quantiles(values, n=20)[18] if len(values) > 1 else values[0]
+
+
+def open_sessions(n, rounds):
+    """Run ``n`` live sessions; returns ``(sessions, latencies in ms, errors)``."""
+    sessions = [[AppTest.from_file(os.path.abspath(p), default_timeout=300) for p in PAGES] for _ in range(n)]
+    latencies, errors = [], []
+    for i in range(rounds):
+        for apps in sessions:
+            for page, app in zip(PAGES, apps):
+                start = time.perf_counter()
+                if i and app.sidebar.selectbox:
+                    box = app.sidebar.selectbox[-1]
+                    if box.key in SELECT_VALUES:
+                        values = SELECT_VALUES[box.key]
+                        box.set_value(values[i % len(values)]).run()
+                    else:
+                        box.select_index(i % len(box.options)).run()
+                else:
+                    app.run()
+                latencies.append(1000 * (time.perf_counter() - start))
+                errors.extend(f"{page}: {e.message}" for e in app.exception)
+    return sessions, latencies, errors
+
+
+def page_data():
+    """Everything the five pages read from the shared store."""
+    df, _ = load_master_with_hash()
+    load_variant_totals()
+    load_variant_counts()
+    load_monetization_cube()
+    load_process_groups()
+    load_top_processes()
+    load_scenario_store()
+    return id(df)
+
+
+def hammer_store(n):
+    """``n`` threads reading the page data at once: ``(latencies, frame ids)``."""
+    latencies, frame_ids = [], set()
+    barrier = threading.Barrier(n)
+
+    def worker():
+        barrier.wait()
+        start = time.perf_counter()
+        frame_id = page_data()
+        latencies.append(1000 * (time.perf_counter() - start))
+        frame_ids.add(frame_id)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, frame_ids
+
+
+def run(counts, rounds=2):
+    rows, errors = [], []
+    for n in counts:
+        before = rss_mb()
+        sessions, latencies, session_errors = open_sessions(n, rounds)
+        added = rss_mb() - before
+        concurrent, frame_ids = hammer_store(n)
+        rows.append({
+            "sessions": n,
+            "reruns": len(latencies),
+            "errors": len(session_errors),
+            "rerun_p50_ms": statistics.median(latencies),
+            "rerun_p95_ms": p95(latencies),
+            "rss_per_session_mb": added / n,
+            "store_p95_ms": p95(concurrent),
+            "master_frames": len(frame_ids),
+        })
+        errors.extend(session_errors)
+        del sessions
+    return pd.DataFrame(rows), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 25])
+    parser.add_argument("--rounds", type=int, default=2, help="reruns per page and session")
+    args = parser.parse_args(argv)
+
+    load_master()  # the server has loaded the data before the class arrives
+    result, errors = run(args.sessions, args.rounds)
+    for error in errors[:5]:
+        print("error:", error)
+    print(result.to_string(index=False, float_format="%.1f"))
+    stats = store_stats()
+    print(f"shared store: {sum(s['frame_bytes'] for s in stats) / 1024:.1f} KB master table, "
+          f"{sum(s['derived_bytes'] for s in stats) / 1024:.1f} KB derived results, "
+          f"{sum(s['derived'] for s in stats)} entries")
+
+
+if __name__ == "__main__":
+    main()
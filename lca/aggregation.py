@@ -0,0 +1,159 @@
+"""Vectorized variant aggregation over the master table.
+
+A variant selects the rows of one fuel whose ``Scenario`` is in its list. All
+variants are encoded once as (variant, row) membership pairs, and every
+variant x impact total is a ``bincount`` over them instead of one
+boolean-mask scan per variant; nothing of size variants x rows is ever
+materialised. The functions take the row positions of each
+variant (``variant_rows``) as ``rows``; the loaders pass the positions
+cached per loaded master table, other callers get them computed on the fly.
+"""
+import numpy as np
+import pandas as pd
+
+from lca.data_loader import MASTER_PATH, impact_columns, load_derived
+from lca.variants import load_variant_map, variant_rows
+
+
+def variant_key(variant_map):
+    return tuple(
+        (variant, rule['Fuel'], tuple(rule['Scenario']))
+        for variant, rule in variant_map.items()
+    )
+
+
+def membership_pairs(df, variant_map, rows=None):
+    """``(variant_idx, row_idx)`` of every membership entry, ordered by variant."""
+    rows = variant_rows(df, variant_map) if rows is None else rows
+    positions = list(rows.values())
+    variant_idx = np.repeat(np.arange(len(positions)), [len(p) for p in positions])
+    row_idx = np.concatenate(positions) if positions else np.array([], dtype=np.intp)
+    return variant_idx, row_idx
+
+
+def pair_sums(keys, row_idx, values, size):
+    """``size`` x column sums of ``values[row_idx]`` by ``keys``, one column at a time."""
+    sums = np.empty((size, values.shape[1]), dtype=np.float64)
+    for i in range(values.shape[1]):
+        sums[:, i] = np.bincount(keys, weights=values[row_idx, i], minlength=size)
+    return sums
+
+
+def impact_matrix(df, columns=None):
+    """Impact values as a float array with NaN treated as 0, like ``DataFrame.sum``."""
+    columns = impact_columns(df) if columns is None else columns
+    return np.nan_to_num(df[columns].to_numpy(dtype=np.float64))
+
+
+def variant_totals(df, variant_map, rows=None):
+    """Variant x impact-category sums."""
+    columns = impact_columns(df)
+    variant_idx, row_idx = membership_pairs(df, variant_map, rows)
+    totals = pair_sums(variant_idx, row_idx, impact_matrix(df, columns), len(variant_map))
+    return pd.DataFrame(totals, index=pd.Index(list(variant_map), name="Variant"), columns=columns)
+
+
+def variant_counts(df, variant_map, rows=None):
+    """Variant x impact-category counts of non-missing values."""
+    columns = impact_columns(df)
+    variant_idx, row_idx = membership_pairs(df, variant_map, rows)
+    counts = pair_sums(variant_idx, row_idx, df[columns].notna().to_numpy(), len(variant_map))
+    return pd.DataFrame(counts, index=pd.Index(list(variant_map), name="Variant"), columns=columns)
+
+
+def group_sums(df, variant_map, by, rows=None):
+    """Dense variant x group x impact sums in one pass over the rows.
+
+    ``by`` is a column name or a named Series of row labels. Returns
+    ``(sums, present, groups, columns)`` where ``present[v, g]`` tells whether
+    variant ``v`` has any row in group ``g``; groups are sorted like
+    ``groupby`` sorts them and rows with a missing label are dropped.
+    """
+    columns = impact_columns(df)
+    labels = df[by] if isinstance(by, str) else by
+    codes, groups = pd.factorize(labels, sort=True)
+    n_variants, n_groups = len(variant_map), len(groups)
+
+    # one (variant, row) pair per membership entry, keyed by (variant, group)
+    variant_idx, row_idx = membership_pairs(df, variant_map, rows)
+    keep = codes[row_idx] >= 0
+    variant_idx, row_idx = variant_idx[keep], row_idx[keep]
+    keys = variant_idx * n_groups + codes[row_idx]
+
+    size = n_variants * n_groups
+    sums = pair_sums(keys, row_idx, impact_matrix(df, columns), size)
+    present = np.bincount(keys, minlength=size) > 0
+    return (sums.reshape(n_variants, n_groups, len(columns)), present.reshape(n_variants, n_groups),
+            pd.Index(groups, name=labels.name), columns)
+
+
+def variant_group_totals(df, variant_map, by, rows=None):
+    """Variant x group x impact sums, as a frame indexed by (Variant, group).
+
+    Only (variant, group) pairs with at least one row are kept, matching what
+    ``groupby(by).sum()`` on each variant's subset would return.
+    """
+    return group_totals_frame(*group_sums(df, variant_map, by, rows), variant_map)
+
+
+def group_totals_frame(sums, present, groups, columns, variant_map):
+    """Frame of the present (variant, group) pairs of ``group_sums`` output."""
+    variant_idx, group_idx = np.nonzero(present)
+    index = pd.MultiIndex.from_arrays(
+        [np.asarray(list(variant_map))[variant_idx], np.asarray(groups)[group_idx]],
+        names=["Variant", groups.name]
+    )
+    return pd.DataFrame(sums[variant_idx, group_idx], index=index, columns=columns)
+
+
+def update_variant_cells(previous, df, diff, variant_map, reduce, rows=None):
+    """Recompute only the variant x impact cells touched by ``diff``.
+
+    ``reduce(values)`` turns a variant's rows of the changed columns into one
+    row of results (a sum or a count); all other cells are copied over.
+    """
+    result = previous.copy()
+    if not diff["columns"]:
+        return result
+    changed = set(diff["rows"].tolist())
+    values = df[diff["columns"]].to_numpy(dtype=np.float64)
+    rows = variant_rows(df, variant_map) if rows is None else rows
+    for variant, positions in rows.items():
+        if changed.intersection(positions.tolist()):
+            result.loc[variant, diff["columns"]] = reduce(values[positions])
+    return result
+
+
+# -----------------------
+# Cached per loaded master.xlsx snapshot
+# -----------------------
+def load_variant_rows(variant_map=None, path=MASTER_PATH):
+    """``variant_rows`` of the loaded master table, built once per snapshot.
+
+    A reload that changes impact values alone keeps the rows as they are.
+    """
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    return load_derived(("variant_rows", variant_key(variant_map)),
+                        lambda df: variant_rows(df, variant_map), path,
+                        update=lambda previous, df, diff: previous)
+
+
+def load_variant_totals(variant_map=None, path=MASTER_PATH):
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    return load_derived(
+        ("variant_totals", variant_key(variant_map)),
+        lambda df: variant_totals(df, variant_map, load_variant_rows(variant_map, path)), path,
+        update=lambda previous, df, diff: update_variant_cells(
+            previous, df, diff, variant_map, lambda v: np.nansum(v, axis=0), load_variant_rows(variant_map, path))
+    )
+
+
+def load_variant_counts(variant_map=None, path=MASTER_PATH):
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    return load_derived(
+        ("variant_counts", variant_key(variant_map)),
+        lambda df: variant_counts(df, variant_map, load_variant_rows(variant_map, path)), path,
+        update=lambda previous, df, diff: update_variant_cells(
+            previous, df, diff, variant_map, lambda v: (~np.isnan(v)).sum(axis=0),
+            load_variant_rows(variant_map, path))
+    )
@@ -0,0 +1,144 @@
+"""Headless batch run of every dashboard computation.
+
+Runs all variants x impact categories x monetization levels (with and without
+the CO₂ correction), the process group contribution, the top-process heatmap
+and the scenario trends in one pass, and writes one table per result::
+
+    python -m lca.batch --master master.xlsx \\
+        --scenarios Optimistic.csv Middle.csv Pessimistic.csv \\
+        --out results --format parquet --workers 4
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from lca.aggregation import variant_counts, variant_group_totals, variant_totals
+from lca.contribution import GROUP_NAME_MAP, group_contribution, process_groups
+from lca.data_loader import MASTER_PATH, load_master
+from lca.heatmap import relative_impacts, top_processes
+from lca.monetization import LEVELS, cube_costs, load_column_mapping, monetization_cube
+from lca.scenarios import SCENARIO_FILES, load_scenario_store, scenario_trends
+from lca.variants import load_variant_map
+
+FORMATS = ("csv", "parquet")
+
+
+def _with_fuel(frame, variant_map):
+    fuels = frame["Variant"].map({variant: rule['Fuel'] for variant, rule in variant_map.items()})
+    frame.insert(frame.columns.get_loc("Variant") + 1, "Fuel", fuels)
+    return frame
+
+
+def build_tasks(scenario_paths):
+    tasks = [("variant_totals",), ("group_contribution",), ("top_processes",), ("monetization",)]
+    if scenario_paths:
+        tasks.append(("scenario_trends",))
+    return tasks
+
+
+def run_task(task, master_path, scenario_paths):
+    """Run one task and return a list of ``(result name, frame)`` pairs."""
+    kind = task[0]
+    variant_map = load_variant_map()
+
+    if kind == "scenario_trends":
+        return [("scenario_trends", scenario_trends(load_scenario_store(scenario_paths)))]
+
+    df = load_master(master_path)
+    totals = variant_totals(df, variant_map)
+
+    if kind == "variant_totals":
+        frame = totals.rename_axis(columns="Impact Category").stack().rename("Total").reset_index()
+        return [("variant_totals", _with_fuel(frame, variant_map))]
+
+    if kind == "group_contribution":
+        percent = group_contribution(variant_group_totals(df, variant_map, process_groups(df)))
+        frame = percent.rename_axis(columns="Impact Category").stack().rename("Contribution (%)").reset_index()
+        frame["Group"] = frame["Group"].map(lambda g: GROUP_NAME_MAP.get(g, g))
+        return [("group_contribution", _with_fuel(frame, variant_map))]
+
+    if kind == "top_processes":
+        processes = top_processes(df, variant_map).stack().rename("Process")
+        relative = relative_impacts(totals).stack().rename("Relative Impact (%)")
+        frame = pd.concat([processes, relative], axis=1).rename_axis(["Impact Category", "Variant"]).reset_index()
+        return [("top_processes", _with_fuel(frame, variant_map))]
+
+    if kind == "monetization":
+        cube = monetization_cube(totals, variant_counts(df, variant_map), variant_map,
+                                 load_column_mapping(df.columns, master_path)["mapping"])
+        order = ["Level", "CO2 correction", "Variant"]
+        breakdowns, sums = [], []
+        for level in LEVELS:
+            for adjusted in (False, True):
+                costs = cube_costs(cube, level, adjusted)
+                keys = {"Level": level, "CO2 correction": adjusted}
+                breakdowns.append(costs.stack().rename("Cost (€)").reset_index().assign(**keys))
+                sums.append(costs.sum(axis=1).rename("Monetized Cost (€)").reset_index().assign(**keys))
+        breakdown = pd.concat(breakdowns, ignore_index=True)
+        total = pd.concat(sums, ignore_index=True)
+        return [
+            ("monetized_costs", _with_fuel(breakdown[order + ["Impact Category", "Cost (€)"]], variant_map)),
+            ("monetized_totals", _with_fuel(total[order + ["Monetized Cost (€)"]], variant_map)),
+        ]
+
+    raise ValueError(f"Unknown task {kind!r}")
+
+
+def run_batch(master_path=MASTER_PATH, scenario_paths=(), workers=1):
+    """Run every task, in a process pool when ``workers > 1``."""
+    tasks = build_tasks(scenario_paths)
+    args = ([master_path] * len(tasks), [list(scenario_paths)] * len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(run_task, tasks, *args))
+    else:
+        outputs = list(map(run_task, tasks, *args))
+
+    parts = {}
+    for output in outputs:
+        for name, frame in output:
+            parts.setdefault(name, []).append(frame)
+    return {name: pd.concat(frames, ignore_index=True) for name, frames in parts.items()}
+
+
+def write_results(results, out_dir, fmt="csv"):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, frame in results.items():
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        if fmt == "parquet":
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute all LCA dashboard results without Streamlit.")
+    parser.add_argument("--master", default=MASTER_PATH, help="master workbook (default: %(default)s)")
+    parser.add_argument("--scenarios", nargs="*", default=None,
+                        help="scenario CSVs (default: the Optimistic/Middle/Pessimistic files that exist)")
+    parser.add_argument("--out", default="results", help="output directory (default: %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--workers", type=int, default=1, help="process pool size (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    scenario_paths = args.scenarios
+    if scenario_paths is None:
+        scenario_paths = [p for p in SCENARIO_FILES if os.path.exists(p)]
+    missing = [p for p in [args.master, *scenario_paths] if not os.path.exists(p)]
+    if missing:
+        parser.error(f"file not found: {', '.join(missing)}")
+
+    results = run_batch(args.master, scenario_paths, args.workers)
+    for path in write_results(results, args.out, args.format):
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
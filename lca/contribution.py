@@ -0,0 +1,95 @@
+"""Process group contribution of each variant's impact totals.
+
+Rows are assigned to life-cycle groups by matching their ``System`` name
+against the regex table in ``process_groups.json``; the first matching
+group wins and anything else (including a missing ``System``) is "other".
+Only the distinct system names are matched, so classifying large
+inventories costs one vectorized lookup per row.
+"""
+import functools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from lca.aggregation import load_variant_rows, variant_group_totals, variant_key
+from lca.data_loader import MASTER_PATH, load_derived
+from lca.variants import load_variant_map
+
+GROUPS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "process_groups.json")
+
+
+@functools.lru_cache(maxsize=None)
+def _load_table(path):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    default = config.get("default", "other")
+    order = [group["name"] for group in config["groups"]]
+    if len(set(order)) != len(order):
+        raise ValueError(f"Duplicate group name in {path}")
+    return {
+        "order": order,
+        "labels": {group["name"]: group["label"] for group in config["groups"]},
+        "patterns": [(group["name"], group["pattern"]) for group in config["groups"]],
+        "default": default,
+        "categories": order + ([default] if default not in order else []),
+    }
+
+
+def load_group_table(path=GROUPS_PATH):
+    """Return the parsed group table. Shared between callers, do not mutate."""
+    return _load_table(os.path.abspath(path))
+
+
+GROUP_ORDER = load_group_table()["order"]
+GROUP_NAME_MAP = load_group_table()["labels"]
+
+
+def classify_systems(systems, path=GROUPS_PATH):
+    """Categorical of the group of every value in ``systems``; non-strings get the default."""
+    table = load_group_table(path)
+    codes, uniques = pd.factorize(pd.Series(systems, dtype=object))
+    names = pd.Series(uniques, dtype=object)
+    labels = np.full(len(names), table["default"], dtype=object)
+    unassigned = np.ones(len(names), dtype=bool)
+    for group, pattern in table["patterns"]:
+        hit = unassigned & names.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+        labels[hit] = group
+        unassigned &= ~hit
+
+    categories = pd.Index(table["categories"])
+    unique_codes = np.append(categories.get_indexer(labels), categories.get_loc(table["default"]))
+    # code -1 (missing System) picks the appended default
+    return pd.Categorical.from_codes(unique_codes[codes], categories=categories)
+
+
+def process_groups(df, path=GROUPS_PATH):
+    return pd.Series(classify_systems(df['System'], path), index=df.index, name="Group")
+
+
+def load_process_groups(path=MASTER_PATH):
+    """``process_groups`` of the loaded master table, built once per snapshot.
+
+    Groups depend only on ``System``, so a reload that changes impact values
+    alone keeps them as they are.
+    """
+    return load_derived("process_groups", process_groups, path,
+                        update=lambda previous, df, diff: previous)
+
+
+def load_group_totals(variant_map=None, path=MASTER_PATH):
+    """Variant x process group x impact sums of the loaded master table."""
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    return load_derived(("group_totals", variant_key(variant_map)),
+                        lambda df: variant_group_totals(df, variant_map, load_process_groups(path),
+                                                        load_variant_rows(variant_map, path)), path)
+
+
+def group_contribution(group_totals):
+    """Percent share of each group in its variant's total, for every impact.
+
+    Variants whose total is not positive get 0 %, as on the dashboard.
+    """
+    total = group_totals.groupby(level="Variant", sort=False).transform("sum")
+    return (group_totals / total.where(total > 0) * 100).fillna(0)
@@ -0,0 +1,372 @@
+"""Shared loader for master.xlsx.
+
+The workbook is parsed with openpyxl at most once per content hash. The typed
+frame is written to a Parquet cache next to the workbook and kept in memory
+for every page and session of the running process, so pages must treat the
+returned frame as read-only.
+
+When the file changes, the new version is parsed in a background thread
+while callers keep getting the previous snapshot; derived results are then
+updated (or rebuilt) before the new snapshot is swapped in.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from lca.instrumentation import record_cache, timed
+
+if int(pd.__version__.split(".")[0]) < 3:
+    # every session gets the same frame objects; with copy-on-write a caller
+    # that modifies "its" frame gets a private copy instead of changing ours
+    pd.set_option("mode.copy_on_write", True)
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # Parquet cache is optional, the in-memory cache is not
+    pyarrow = None
+
+MASTER_PATH = "master.xlsx"
+CACHE_DIR = ".cache"
+ID_COLUMNS = ["Scenario", "Fuel", "System", "Process"]
+IMPACT_START = len(ID_COLUMNS)
+LABEL_COLUMNS = ["Fuel", "System", "Process"]
+
+# "off": strings and float64 as parsed; "categories": categorical label
+# columns (lossless, the default); "float32": also store impacts as float32
+COMPACT_MODES = ["off", "categories", "float32"]
+COMPACT_ENV = "LCA_COMPACT"
+# results of slider sweeps kept by load_sweep, across snapshots
+MAX_SWEEP_ENTRIES = 32
+
+_lock = threading.Lock()
+_memory = {}
+_reloading = set()
+_local = threading.local()
+_sweeps = OrderedDict()
+
+
+def impact_columns(df):
+    return df.columns[IMPACT_START:].tolist()
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def coerce_master(df):
+    df['Scenario'] = pd.to_numeric(df['Scenario'], errors='coerce').astype("Int64")
+    impacts = df.columns[IMPACT_START:]
+    df[impacts] = df[impacts].apply(pd.to_numeric, errors='coerce').astype("float64")
+    return df
+
+
+def compact_mode():
+    mode = os.environ.get(COMPACT_ENV, "categories").lower()
+    if mode not in COMPACT_MODES:
+        raise ValueError(f"{COMPACT_ENV} must be one of {COMPACT_MODES}, got {mode!r}")
+    return mode
+
+
+def compact_master(df, mode="categories"):
+    """Return ``df`` with categorical label columns and, for "float32", float32 impacts.
+
+    Aggregations still accumulate in float64, so "float32" only loses
+    precision in the stored values (about 7 significant digits).
+    """
+    if mode == "off":
+        return df
+    df = df.astype({c: "category" for c in LABEL_COLUMNS if c in df.columns})
+    if mode == "float32":
+        df = df.astype({c: "float32" for c in impact_columns(df)})
+    return df
+
+
+def memory_report(df):
+    """Bytes held by ``df`` per column next to the plain string/float64 layout."""
+    plain = df.astype({
+        **{c: str for c in LABEL_COLUMNS if c in df.columns},
+        **{c: "float64" for c in impact_columns(df)},
+    })
+    columns = pd.DataFrame({
+        "dtype": df.dtypes.astype(str),
+        "bytes": df.memory_usage(index=False, deep=True),
+        "plain_bytes": plain.memory_usage(index=False, deep=True),
+    })
+    total, baseline = int(columns["bytes"].sum()), int(columns["plain_bytes"].sum())
+    return {"bytes": total, "plain_bytes": baseline, "saved_bytes": baseline - total, "columns": columns}
+
+
+def cache_dir_for(path):
+    """On-disk cache directory used for files derived from ``path``."""
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+
+
+def _cache_path(path, content_hash):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir_for(path), f"{name}-{content_hash[:16]}.parquet")
+
+
+def _read_or_parse(path):
+    df, content_hash = _read_cached(path)
+    return compact_master(df, compact_mode()), content_hash
+
+
+def _read_cached(path):
+    content_hash = file_hash(path)
+    cache_path = _cache_path(path, content_hash)
+    if pyarrow is not None and os.path.exists(cache_path):
+        return pd.read_parquet(cache_path), content_hash
+
+    df = coerce_master(pd.read_excel(path, sheet_name=0))
+    if pyarrow is not None:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            df.to_parquet(cache_path, index=False)
+        except OSError:
+            pass  # read-only deployments still get the in-memory cache
+    return df, content_hash
+
+
+def diff_frames(old, new):
+    """Changed cells between two master snapshots.
+
+    Returns ``{"rows", "columns"}`` (positions of rows with any changed impact
+    value and the changed impact columns), or ``None`` when the layout
+    differs (columns, row count or identifier columns), which calls for a
+    full rebuild.
+    """
+    if list(old.columns) != list(new.columns) or len(old) != len(new):
+        return None
+    ids = [c for c in ID_COLUMNS if c in new.columns]
+    if not old[ids].reset_index(drop=True).equals(new[ids].reset_index(drop=True)):
+        return None
+    impacts = impact_columns(new)
+    before = old[impacts].to_numpy(dtype="float64")
+    after = new[impacts].to_numpy(dtype="float64")
+    changed = ~((before == after) | (np.isnan(before) & np.isnan(after)))
+    return {
+        "rows": np.flatnonzero(changed.any(axis=1)),
+        "columns": [impacts[i] for i in np.flatnonzero(changed.any(axis=0))],
+    }
+
+
+def _new_snapshot(fingerprint, df, content_hash):
+    return {"fingerprint": fingerprint, "df": df, "hash": content_hash, "derived": {}}
+
+
+def _snapshot(path):
+    key = os.path.abspath(path)
+    pending = getattr(_local, "pending", {})
+    if key in pending:
+        return pending[key]
+
+    with _lock:
+        snapshot = _memory.get(key)
+        if snapshot is None:
+            # cold start: nothing to serve yet, so parse in the caller's thread
+            fingerprint = file_fingerprint(path)
+            with timed(os.path.basename(path), "load"):
+                df, content_hash = _read_or_parse(path)
+            snapshot = _new_snapshot(fingerprint, df, content_hash)
+            _memory[key] = snapshot
+            return snapshot
+    try:
+        fingerprint = file_fingerprint(path)
+    except OSError:  # mid-save (delete, then rename): keep serving what we have
+        return snapshot
+    if fingerprint not in (snapshot["fingerprint"], snapshot.get("failed_fingerprint")):
+        schedule_reload(path)
+    return snapshot
+
+
+def schedule_reload(path=MASTER_PATH):
+    """Re-parse ``path`` in a background thread unless a reload is running.
+
+    Callers keep getting the current snapshot until the new one, with its
+    derived results, is swapped in.
+    """
+    key = os.path.abspath(path)
+    with _lock:
+        if key in _reloading or key not in _memory:
+            return False
+        _reloading.add(key)
+    threading.Thread(target=_reload, args=(path,), name=f"reload-{os.path.basename(path)}", daemon=True).start()
+    return True
+
+
+def _record_failure(snapshot, fingerprint, exc):
+    """Mark ``fingerprint`` as failed so loaders stop scheduling reloads of it."""
+    with _lock:
+        snapshot["failed_fingerprint"] = fingerprint
+        snapshot["reload_error"] = repr(exc)
+
+
+def _reload(path):
+    key = os.path.abspath(path)
+    try:
+        old = _memory[key]
+        fingerprint = file_fingerprint(path)
+        if fingerprint == old["fingerprint"] or fingerprint == old.get("failed_fingerprint"):
+            return
+        try:
+            df, content_hash = _read_or_parse(path)
+        except Exception as exc:  # half-written workbook: keep serving the old one
+            _record_failure(old, fingerprint, exc)
+            return
+
+        if content_hash == old["hash"]:
+            with _lock:
+                old["fingerprint"] = fingerprint
+            return
+
+        snapshot = _new_snapshot(fingerprint, df, content_hash)
+        diff = diff_frames(old["df"], df)
+        _local.pending = {key: snapshot}
+        try:
+            for name, entry in list(old["derived"].items()):
+                if name in snapshot["derived"]:
+                    continue
+                if entry["update"] is not None and diff is not None:
+                    result = entry["update"](entry["result"], df, diff)
+                else:
+                    result = entry["build"](df)
+                snapshot["derived"].setdefault(name, dict(entry, result=result))
+        except Exception as exc:  # e.g. a renamed column: keep the old snapshot, don't retry
+            _record_failure(old, fingerprint, exc)
+            return
+        finally:
+            _local.pending = {}
+        snapshot["diff"] = diff
+        with _lock:
+            _memory[key] = snapshot
+    finally:
+        with _lock:
+            _reloading.discard(key)
+
+
+def reload_status(path=MASTER_PATH):
+    """``{"loaded", "reloading", "hash", "error"}`` for the workbook at ``path``."""
+    key = os.path.abspath(path)
+    with _lock:
+        snapshot = _memory.get(key)
+        return {
+            "loaded": snapshot is not None,
+            "reloading": key in _reloading,
+            "hash": snapshot["hash"] if snapshot else None,
+            "error": snapshot.get("reload_error") if snapshot else None,
+        }
+
+
+def _nbytes(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(_nbytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_nbytes(v) for v in obj)
+    return 0
+
+
+def store_stats():
+    """Size of every loaded workbook snapshot and its derived results.
+
+    This is the process-wide store all sessions read from; ``frame_id``
+    identifies the one frame object they share.
+    """
+    with _lock:
+        snapshots = dict(_memory)
+    return [
+        {
+            "path": key,
+            "hash": snapshot["hash"],
+            "frame_id": id(snapshot["df"]),
+            "frame_bytes": _nbytes(snapshot["df"]),
+            "derived": len(snapshot["derived"]),
+            "derived_bytes": sum(_nbytes(e["result"]) for e in list(snapshot["derived"].values())),
+        }
+        for key, snapshot in snapshots.items()
+    ]
+
+
+def load_master_with_hash(path=MASTER_PATH):
+    """Return ``(df, content_hash)`` for the workbook at ``path``."""
+    snapshot = _snapshot(path)
+    return snapshot["df"], snapshot["hash"]
+
+
+def load_master(path=MASTER_PATH):
+    return _snapshot(path)["df"]
+
+
+def load_derived(name, builder, path=MASTER_PATH, update=None):
+    """Return ``builder(df)`` computed once per loaded snapshot of ``path``.
+
+    ``name`` must be hashable and identify everything ``builder`` depends on
+    besides the master table. When the workbook changes, the result is
+    carried into the new snapshot in the background: through
+    ``update(old_result, new_df, diff)`` if given and only impact values
+    changed (see ``diff_frames``), otherwise by calling ``builder`` again.
+    """
+    snapshot = _snapshot(path)
+    derived = snapshot["derived"]
+    label = name[0] if isinstance(name, tuple) else str(name)
+    record_cache("derived", label, name in derived)
+    if name not in derived:
+        with timed(label, "aggregate"):
+            entry = {"result": builder(snapshot["df"]), "build": builder, "update": update}
+        with _lock:
+            derived.setdefault(name, entry)
+    return derived[name]["result"]
+
+
+def load_sweep(name, builder, path=MASTER_PATH):
+    """Like ``load_derived`` for results keyed on slider values and edits.
+
+    Entries live in a process-wide LRU of ``MAX_SWEEP_ENTRIES`` keyed on the
+    snapshot's content hash, so they are not carried into a new snapshot:
+    after a reload each one is rebuilt only when it is next requested.
+    """
+    snapshot = _snapshot(path)
+    key = (os.path.abspath(path), snapshot["hash"], name)
+    label = name[0] if isinstance(name, tuple) else str(name)
+    with _lock:
+        hit = key in _sweeps
+        if hit:
+            _sweeps.move_to_end(key)
+            result = _sweeps[key]
+    record_cache("sweep", label, hit)
+    if not hit:
+        with timed(label, "aggregate"):
+            result = builder(snapshot["df"])
+        with _lock:
+            result = _sweeps.setdefault(key, result)
+            _sweeps.move_to_end(key)
+            while len(_sweeps) > MAX_SWEEP_ENTRIES:
+                _sweeps.popitem(last=False)
+    return result
+
+
+def load_memory_report(path=MASTER_PATH):
+    """``memory_report`` of the loaded master table, once per snapshot.
+
+    The table is shared by every session of the process, so this is also
+    the whole per-process cost; sessions hold no copies of their own.
+    """
+    return load_derived("memory_report", memory_report, path)
@@ -0,0 +1,89 @@
+"""Sidebar performance panel for the instrumentation in ``lca.instrumentation``.
+
+With ``lca.skeleton``, this is the only ``lca`` code that talks to
+Streamlit. The panel is off unless the server runs with
+``LCA_INSTRUMENT=1`` or the page URL carries ``?debug=1``; when off, pages
+pay for nothing but a flag check.
+"""
+import json
+
+import pandas as pd
+import streamlit as st
+
+from lca.data_loader import compact_mode, load_memory_report, reload_status
+from lca.figure_cache import cache_stats
+from lca.instrumentation import (
+    STAGES, current_run, enabled_by_env, export_jsonl, finish_run, history,
+    record_payload, start_run, timed,
+)
+from lca.warmup import record_first_chart, warmup_status
+
+
+def start_page_run(page):
+    """Open an instrumentation run for this rerun when the panel is enabled."""
+    if enabled_by_env() or st.query_params.get("debug") == "1":
+        start_run(page)
+
+
+def plotly_chart(fig, name, **kwargs):
+    """``st.plotly_chart`` timed as a render, recording the figure's JSON size."""
+    if current_run() is not None:
+        payload = json.dumps(fig) if isinstance(fig, dict) else fig.to_json()
+        record_payload(name, len(payload.encode("utf-8")))
+    with timed(name, "render"):
+        chart = st.plotly_chart(fig, **kwargs)
+    record_first_chart()
+    return chart
+
+
+def echarts(options, name, **kwargs):
+    """``st_echarts`` timed as a render, recording the options' JSON size."""
+    from streamlit_echarts import st_echarts
+
+    if current_run() is not None:
+        record_payload(name, len(json.dumps(options).encode("utf-8")))
+    with timed(name, "render"):
+        chart = st_echarts(options=options, **kwargs)
+    record_first_chart()
+    return chart
+
+
+def show_debug_panel():
+    """Close the run and render it in the sidebar. Call at the end of the page."""
+    record = finish_run()
+    if record is None:
+        return
+    with st.sidebar.expander("🐞 Performance", expanded=True):
+        st.metric("Rerun", f"{record['total_ms']:.0f} ms")
+        st.dataframe(pd.DataFrame({
+            "Stage": STAGES,
+            "ms": [record["stages_ms"][stage] for stage in STAGES],
+        }), hide_index=True)
+        st.caption(f"Payload sent: {record['payload_bytes'] / 1024:.1f} KB")
+        if record["first_chart_ms"] is not None:
+            st.caption(f"First chart after {record['first_chart_ms']:.0f} ms of this rerun")
+        warmup = warmup_status()
+        if warmup["ready_s"] is not None:
+            st.caption(
+                f"Cold start: data warm after {warmup['ready_s']:.2f} s"
+                + (f", first chart after {warmup['first_chart_s']:.2f} s" if warmup["first_chart_s"] is not None else "")
+            )
+        rates = {cache: f"{rate:.0%}" for cache, rate in record["cache_hit_rate"].items()}
+        stats = cache_stats()
+        st.caption(
+            "Cache hits this rerun: "
+            + (", ".join(f"{cache} {rate}" for cache, rate in rates.items()) or "none")
+            + f" · figure cache overall {stats['hit_rate']:.0%} of {stats['hits'] + stats['misses']}"
+        )
+        if reload_status()["loaded"]:
+            report = load_memory_report()
+            st.caption(
+                f"Master table ({compact_mode()} mode): {report['bytes'] / 1024:.1f} KB, "
+                f"{report['saved_bytes'] / 1024:.1f} KB less than plain strings/float64; "
+                "one copy shared by all sessions"
+            )
+        events = [e for e in record["events"] if e["type"] == "timer"]
+        if events:
+            st.dataframe(pd.DataFrame(events)[["stage", "name", "ms"]], hide_index=True)
+        st.download_button("Download runs (JSON lines)", export_jsonl(history()),
+                           file_name="lca-perf.jsonl", mime="application/json")
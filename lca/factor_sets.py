@@ -0,0 +1,153 @@
+"""User-defined monetization factor sets.
+
+A factor set is a name plus €/unit factors for the monetization categories.
+The built-in EF 3.1 Low/Central/High sets are always available, and user
+sets (uploaded CSVs or edited in the page) are saved as JSON under the
+cache directory, one file per set name.
+
+The variant x category totals are aggregated once per loaded master table;
+costs for K sets are then one ``totals @ factors.T`` product over a K x
+category matrix. Results are cached per set hash, so adding a set only
+evaluates that set.
+"""
+import glob
+import hashlib
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from lca.aggregation import load_variant_counts, load_variant_totals, variant_key
+from lca.data_loader import MASTER_PATH, cache_dir_for, load_master, load_sweep
+from lca.monetization import (
+    CO2_CATEGORY, LEVELS, MONETIZATION_FACTORS, corrected_totals, factors_for, load_column_mapping,
+)
+from lca.variants import load_variant_map
+
+CATEGORIES = list(MONETIZATION_FACTORS)
+BUILTIN_PREFIX = "EF 3.1 "
+
+_lock = threading.Lock()
+
+
+def set_hash(factors):
+    """Hash of a set's factors; the name is only a label."""
+    canonical = {c: float(factors.get(c, 0.0)) for c in CATEGORIES}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def make_set(name, factors):
+    """Validated ``{"name", "factors", "hash"}`` set; missing categories count as 0."""
+    unknown = sorted(set(factors) - set(CATEGORIES))
+    if unknown:
+        raise ValueError(f"Unknown monetization categories: {', '.join(unknown)}")
+    values = {}
+    for category, value in factors.items():
+        value = float(value)
+        if not np.isfinite(value):
+            raise ValueError(f"Factor for {category!r} in set {name!r} is not a number")
+        values[category] = value
+    return {"name": str(name), "factors": values, "hash": set_hash(values)}
+
+
+def builtin_sets():
+    return [make_set(BUILTIN_PREFIX + level, factors_for(level)) for level in LEVELS]
+
+
+def parse_factor_csv(data):
+    """Sets from a CSV with a ``Category`` column and one column per set."""
+    frame = pd.read_csv(io.BytesIO(data) if isinstance(data, bytes) else data)
+    if "Category" not in frame.columns or len(frame.columns) < 2:
+        raise ValueError("Factor CSV needs a 'Category' column and at least one set column")
+    frame = frame.set_index("Category")
+    values = frame.apply(pd.to_numeric, errors="coerce")
+    bad = values.isna() & frame.notna()
+    if bad.any().any():
+        raise ValueError("Non-numeric factors in columns: " + ", ".join(bad.columns[bad.any()]))
+    return [make_set(name, values[name].dropna().to_dict()) for name in values.columns]
+
+
+def factor_set_dir(path=MASTER_PATH):
+    return os.path.join(cache_dir_for(path), "factor-sets")
+
+
+def _set_file(name, path):
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(factor_set_dir(path), f"{digest}.json")
+
+
+def save_factor_sets(sets, path=MASTER_PATH):
+    """Save user sets; nothing is written if any name is already taken."""
+    taken = {s["name"] for s in list_factor_sets(path)}
+    names = [s["name"] for s in sets]
+    clashes = sorted({n for n in names if n in taken or names.count(n) > 1})
+    if clashes:
+        raise ValueError(f"Factor sets already exist, delete them or pick other names: {', '.join(clashes)}")
+    os.makedirs(factor_set_dir(path), exist_ok=True)
+    for factor_set in sets:
+        with open(_set_file(factor_set["name"], path), "w", encoding="utf-8") as f:
+            json.dump({"name": factor_set["name"], "factors": factor_set["factors"]}, f, ensure_ascii=False, indent=2)
+    return sets
+
+
+def delete_factor_set(factor_set, path=MASTER_PATH):
+    try:
+        os.remove(_set_file(factor_set["name"], path))
+    except FileNotFoundError:
+        pass
+
+
+def list_factor_sets(path=MASTER_PATH):
+    """Built-in sets followed by the saved user sets, sorted by name."""
+    saved = []
+    for file_path in glob.glob(os.path.join(factor_set_dir(path), "*.json")):
+        try:
+            with open(file_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            saved.append(make_set(stored["name"], stored["factors"]))
+        except (OSError, ValueError, KeyError):
+            continue  # skip half-written or hand-broken files
+    return builtin_sets() + sorted(saved, key=lambda s: s["name"])
+
+
+def factor_matrix(sets, categories=CATEGORIES):
+    """K x category matrix of the sets' factors."""
+    return np.array([[s["factors"].get(c, 0.0) for c in categories] for s in sets], dtype=np.float64)
+
+
+def set_costs(totals, sets, column_mapping):
+    """Variant x set total monetized cost (€) as one matrix product."""
+    categories = list(column_mapping)
+    sums = totals[[column_mapping[c] for c in categories]].to_numpy(dtype=np.float64)
+    return sums @ factor_matrix(sets, categories).T
+
+
+def load_set_costs(sets, variant_map=None, apply_adjustment=False, path=MASTER_PATH):
+    """Variant x set cost frame for ``sets``, evaluating only sets not seen before.
+
+    Per-set results are kept per loaded master snapshot (``load_sweep``), so
+    a changed workbook starts a fresh cache while new sets never re-aggregate it.
+    """
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    mapping = load_column_mapping(load_master(path).columns, path)["mapping"]
+    totals = load_variant_totals(variant_map, path)
+    if apply_adjustment:
+        totals = corrected_totals(totals, load_variant_counts(variant_map, path), variant_map,
+                                  mapping.get(CO2_CATEGORY))
+    cache = load_sweep(("set_costs", variant_key(variant_map), bool(apply_adjustment)), lambda df: {}, path)
+
+    with _lock:
+        missing = list({s["hash"]: s for s in sets if s["hash"] not in cache}.values())
+    if missing:
+        costs = set_costs(totals, missing, mapping)
+        with _lock:
+            for k, factor_set in enumerate(missing):
+                cache[factor_set["hash"]] = costs[:, k]
+    return pd.DataFrame(
+        np.column_stack([cache[s["hash"]] for s in sets]) if sets else np.empty((len(variant_map), 0)),
+        index=pd.Index(list(variant_map), name="Variant"),
+        columns=[s["name"] for s in sets],
+    )
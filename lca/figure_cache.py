@@ -0,0 +1,65 @@
+"""Process-wide LRU cache of built Plotly figures.
+
+Figures are stored as their JSON payload under a hash of everything that went
+into them (page, data hash, sidebar selections), so every session that asks
+for the same view reuses one build. Each hit returns a fresh dict that
+``st.plotly_chart`` accepts like a figure.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from lca.instrumentation import record_cache, timed
+
+MAX_ENTRIES = 256
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def figure_key(*parts):
+    encoded = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def cached_figure(key_parts, build):
+    """Return the figure for ``key_parts``, calling ``build()`` only on a miss."""
+    key = figure_key(*key_parts)
+    with _lock:
+        payload = _entries.get(key)
+        if payload is not None:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+    name = str(key_parts[0])
+    record_cache("figure", name, payload is not None)
+    if payload is None:
+        with timed(name, "figure"):
+            payload = build().to_json()
+        with _lock:
+            _stats["misses"] += 1
+            _entries[key] = payload
+            _entries.move_to_end(key)
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+                _stats["evictions"] += 1
+    return json.loads(payload)
+
+
+def cache_stats():
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "entries": len(_entries),
+            "bytes": sum(len(p) for p in _entries.values()),
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+        }
+
+
+def clear_figure_cache():
+    with _lock:
+        _entries.clear()
+        for name in _stats:
+            _stats[name] = 0
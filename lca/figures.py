@@ -0,0 +1,97 @@
+"""Plotly figure builders shared by the dashboard pages and benchmarks."""
+import numpy as np
+
+HEATMAP_MODES = ["text", "annotations"]
+# cells above this relative impact (%) get white labels
+HEATMAP_WHITE_ABOVE = 60
+
+
+def build_heatmap_figure(norm_df, top_df, mode="text"):
+    """Top-process heatmap of ``norm_df`` (impact x variant, in %).
+
+    ``mode="text"`` passes the process labels through ``go.Heatmap``'s
+    ``text``/``texttemplate``: cells above ``HEATMAP_WHITE_ABOVE`` are drawn
+    by a second heatmap trace with the same colour scale and white labels, so
+    font colours are chosen with one array mask. ``mode="annotations"`` is
+    the original one-annotation-per-cell rendering, kept for comparison.
+    """
+    import plotly.graph_objects as go
+
+    if mode not in HEATMAP_MODES:
+        raise ValueError(f"Unknown heatmap mode {mode!r}")
+    display_index = norm_df.index.str.replace(r"\s*\(.*\)", "", regex=True)
+    z = norm_df.to_numpy(dtype=np.float64)
+    labels = top_df.reindex(index=norm_df.index, columns=norm_df.columns).fillna("").to_numpy(dtype=object)
+    heatmap = dict(
+        x=norm_df.columns,
+        y=norm_df.index,
+        colorscale='Reds',
+        zmin=np.nanmin(z) if np.isfinite(z).any() else None,
+        zmax=np.nanmax(z) if np.isfinite(z).any() else None,
+        hoverongaps=False
+    )
+
+    if mode == "text":
+        white = np.nan_to_num(z, nan=-np.inf) > HEATMAP_WHITE_ABOVE
+        fig = go.Figure(data=[
+            go.Heatmap(
+                z=z,
+                text=np.where(white, "", labels),
+                texttemplate="%{text}",
+                textfont=dict(color="black", size=10),
+                colorbar=dict(title="Relative Impact (%)"),
+                **heatmap
+            ),
+            go.Heatmap(
+                z=np.where(white, z, np.nan),
+                text=np.where(white, labels, ""),
+                texttemplate="%{text}",
+                textfont=dict(color="white", size=10),
+                showscale=False,
+                hoverinfo="skip",
+                **heatmap
+            ),
+        ])
+        xaxis = dict(showticklabels=True, side="top", tickfont=dict(color='black', size=12))
+    else:
+        fig = go.Figure(data=go.Heatmap(z=z, colorbar=dict(title="Relative Impact (%)"), **heatmap))
+        for i, impact in enumerate(norm_df.index):
+            for j, fuel in enumerate(norm_df.columns):
+                font_color = "white" if z[i, j] > HEATMAP_WHITE_ABOVE else "black"
+                fig.add_annotation(
+                    text=labels[i, j],
+                    x=fuel,
+                    y=impact,
+                    showarrow=False,
+                    font=dict(color=font_color, size=10),
+                    xanchor="center",
+                    yanchor="middle"
+                )
+        for fuel in norm_df.columns:
+            fig.add_annotation(
+                x=fuel,
+                y=1.03,
+                text=fuel,
+                xref="x",
+                yref="paper",
+                showarrow=False,
+                font=dict(color='black', size=12),
+                xanchor="center",
+                yanchor="middle"
+            )
+        xaxis = dict(showticklabels=False, side="top")
+
+    fig.update_layout(
+        xaxis=xaxis,
+        yaxis=dict(
+            title="Impact Category",
+            tickfont=dict(size=10),
+            tickvals=list(norm_df.index),
+            ticktext=list(display_index)
+        ),
+        title="🔧 Top-Contributing Process per Environmental Impact",
+        height=1000,
+        width=1000,
+        margin=dict(l=180, r=40, t=80, b=100)
+    )
+    return fig
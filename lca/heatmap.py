@@ -0,0 +1,41 @@
+"""Top-contributing process and relative impact per variant."""
+import numpy as np
+import pandas as pd
+
+from lca.aggregation import group_sums, load_variant_rows
+from lca.data_loader import MASTER_PATH, load_derived
+from lca.variants import load_variant_map
+
+
+def top_processes(df, variant_map, rows=None):
+    """Impact x variant frame with the process that contributes most.
+
+    Sums every (variant, process, impact) cell in one pass and takes the
+    argmax over processes for all impacts at once. Ties go to the first
+    process in sorted order, like ``idxmax`` on a ``groupby`` result; a
+    variant without rows gets "N/A".
+    """
+    return top_from_group_sums(*group_sums(df, variant_map, "Process", rows), variant_map)
+
+
+def top_from_group_sums(sums, present, processes, columns, variant_map):
+    """Argmax over the process axis of ``group_sums`` output."""
+    labels = np.full((len(variant_map), len(columns)), "N/A", dtype=object)
+    if len(processes):
+        masked = np.where(present[:, :, None], sums, -np.inf)
+        top = processes.to_numpy(dtype=object)[masked.argmax(axis=1)]
+        has_rows = present.any(axis=1)
+        labels[has_rows] = top[has_rows]
+    return pd.DataFrame(labels.T, index=columns, columns=list(variant_map))
+
+
+def relative_impacts(totals):
+    """Impact x variant totals as a percentage of each impact's maximum."""
+    heatmap_df = totals.T
+    return (heatmap_df / heatmap_df.max(axis=1).values.reshape(-1, 1)) * 100
+
+
+def load_top_processes(variant_map=None, path=MASTER_PATH):
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    return load_derived(("top_processes", tuple(variant_map)),
+                        lambda df: top_processes(df, variant_map, load_variant_rows(variant_map, path)), path)
@@ -0,0 +1,123 @@
+"""Opt-in per-rerun performance instrumentation.
+
+A page opens a run with ``start_run(page)``. While it is open, ``timed``
+blocks, ``record_payload`` and ``record_cache`` add events to it; outside a
+run they do nothing, so library code is instrumented unconditionally.
+``finish_run`` closes the run, keeps it in a bounded history and logs it as
+one JSON record on the ``lca.perf`` logger.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+ENV_FLAG = "LCA_INSTRUMENT"
+STAGES = ["load", "aggregate", "figure", "render"]
+HISTORY = 200
+
+logger = logging.getLogger("lca.perf")
+
+_local = threading.local()
+_lock = threading.Lock()
+_history = deque(maxlen=HISTORY)
+
+
+def enabled_by_env():
+    return os.environ.get(ENV_FLAG, "").lower() not in ("", "0", "false")
+
+
+def start_run(page):
+    _local.run = {"page": page, "started": time.time(), "start": time.perf_counter(), "events": []}
+    return _local.run
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def _add(event):
+    run = current_run()
+    if run is not None:
+        run["events"].append(event)
+
+
+@contextmanager
+def timed(name, stage):
+    """Time the block as ``name`` in ``stage`` (one of ``STAGES``)."""
+    if current_run() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _add({"type": "timer", "stage": stage, "name": name, "ms": 1000 * (end - start),
+              "at_ms": 1000 * (end - current_run()["start"])})
+
+
+def record_payload(name, nbytes):
+    _add({"type": "payload", "name": name, "bytes": int(nbytes)})
+
+
+def record_cache(cache, name, hit):
+    _add({"type": "cache", "cache": cache, "name": name, "hit": bool(hit)})
+
+
+def summarize(run):
+    """Per-stage milliseconds, payload bytes and hit rate per cache of ``run``.
+
+    ``first_chart_ms`` is when the first render finished, from the start of
+    the run (None if nothing was rendered).
+    """
+    stages = {stage: 0.0 for stage in STAGES}
+    payload, caches, first_chart = 0, {}, None
+    for event in run["events"]:
+        if event["type"] == "timer":
+            stages[event["stage"]] = stages.get(event["stage"], 0.0) + event["ms"]
+            if event["stage"] == "render" and first_chart is None:
+                first_chart = event["at_ms"]
+        elif event["type"] == "payload":
+            payload += event["bytes"]
+        else:
+            hits, lookups = caches.get(event["cache"], (0, 0))
+            caches[event["cache"]] = (hits + event["hit"], lookups + 1)
+    return {
+        "stages_ms": stages,
+        "payload_bytes": payload,
+        "first_chart_ms": first_chart,
+        "cache_hit_rate": {cache: hits / lookups for cache, (hits, lookups) in caches.items()},
+    }
+
+
+def finish_run():
+    """Close the current run and return its log record, or None if none is open."""
+    run = current_run()
+    if run is None:
+        return None
+    _local.run = None
+    record = {
+        "page": run["page"],
+        "started": run["started"],
+        "total_ms": 1000 * (time.perf_counter() - run["start"]),
+        **summarize(run),
+        "events": run["events"],
+    }
+    with _lock:
+        _history.append(record)
+    logger.info(json.dumps(record, default=str))
+    return record
+
+
+def history():
+    with _lock:
+        return list(_history)
+
+
+def export_jsonl(records=None):
+    """Runs as JSON lines, the format of the ``lca.perf`` log."""
+    records = history() if records is None else records
+    return "".join(json.dumps(r, default=str) + "\n" for r in records)
@@ -0,0 +1,183 @@
+"""EF 3.1 monetization of variant impact totals.
+
+All variant x category x factor level x CO₂ correction costs are computed
+once per loaded master table as a NumPy cube; the dashboard only slices it.
+"""
+import hashlib
+import json
+import os
+import threading
+from difflib import SequenceMatcher, get_close_matches
+
+import numpy as np
+import pandas as pd
+
+from lca.aggregation import load_variant_counts, load_variant_totals
+from lca.data_loader import MASTER_PATH, cache_dir_for, load_derived
+from lca.variants import load_variant_map
+
+LEVELS = ["Low", "Central", "High"]
+
+# €/unit for the Low, Central and High scenario
+MONETIZATION_FACTORS = {
+    "Climate change (kg CO₂ eq.)": [0.0615, 0.1025, 0.1936],
+    "Ozone Depletion Potential (kg CFC-11 eq.)": [22.8, 31.4, 127.2],
+    "Ionising Radiation – Human Health (kBq U-235 eq.)": [0.0008, 0.00120, 0.0461],
+    "Photochemical Ozone Creation Potential (kg NMVOC eq.)": [0.87, 1.19, 1.90],
+    "Particulate Matter Formation (Disease incidence)": [661974, 784126, 1204600],
+    "Human Toxicity – Non-Carcinogenic (CTUh)": [30211, 163447, 755270],
+    "Human Toxicity – Carcinogenic (CTUh)": [174324, 902616, 2789181],
+    "Acidification (mol H⁺ eq.)": [0.176, 0.344, 1.617],
+    "Eutrophication Potential – Freshwater (kg P eq.)": [0.26, 1.92, 2.18],
+    "Eutrophication Potential – Marine (kg N eq.)": [3.21, 3.21, 3.21],
+    "Ecotoxicity – Freshwater (CTUe)": [2.39e-24, 3.82e-05, 1.89e-04],
+    "Land Use (Pt)": [0.000087, 0.000175, 0.000349],
+    "Water Use (m³ world eq.)": [0.00419, 0.00499, 0.2359],
+    "Resource Use – Fossils (MJ)": [0, 0.0013, 0.0068],
+    "Material resources: metals/minerals (kg Sb eq.)": [0, 1.64, 6.53]
+}
+
+COLUMN_OVERRIDES = {
+    "Resource Use – Fossils (MJ)": "Energy resources: non-renewable (MJ)"
+}
+
+CO2_CATEGORY = "Climate change (kg CO₂ eq.)"
+# kg CO₂ subtracted from every row of these fuels when the correction is on
+CO2_CORRECTIONS = {'STL': 7.4, 'PTL': 6.34}
+
+
+def factors_for(level):
+    index = LEVELS.index(level)
+    return {category: values[index] for category, values in MONETIZATION_FACTORS.items()}
+
+
+# -----------------------
+# Category → column mapping
+# -----------------------
+MATCH_CUTOFF = 0.6
+
+_mapping_lock = threading.Lock()
+_mappings = {}
+
+
+def schema_hash(columns):
+    """Hash of everything the category → column mapping depends on."""
+    schema = {
+        "columns": [str(c) for c in columns],
+        "categories": list(MONETIZATION_FACTORS),
+        "overrides": COLUMN_OVERRIDES,
+        "cutoff": MATCH_CUTOFF,
+    }
+    return hashlib.sha256(json.dumps(schema, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def match_columns(columns):
+    """Resolve every monetization category against ``columns``.
+
+    Returns ``{"mapping", "details", "unmatched"}`` where ``details`` lists
+    the matched column, how it was found and its similarity score per category.
+    """
+    columns = [str(c) for c in columns]
+    mapping, details, unmatched = {}, [], []
+    for key in MONETIZATION_FACTORS:
+        if key in COLUMN_OVERRIDES:
+            column, method = COLUMN_OVERRIDES[key], "override"
+        elif key in columns:
+            column, method = key, "exact"
+        else:
+            match = get_close_matches(key, columns, n=1, cutoff=MATCH_CUTOFF)
+            column, method = (match[0], "fuzzy") if match else (None, None)
+        if column is None:
+            unmatched.append(key)
+            continue
+        mapping[key] = column
+        details.append({
+            "Category": key,
+            "Column": column,
+            "Method": method,
+            "Score": round(SequenceMatcher(None, key, column).ratio(), 3),
+        })
+    return {"mapping": mapping, "details": details, "unmatched": unmatched}
+
+
+def load_column_mapping(columns, path=MASTER_PATH):
+    """``match_columns`` memoized per schema hash, in memory and on disk.
+
+    The resolved mapping is persisted next to ``path`` so the same workbook
+    headers always map to the same columns, and changed headers show up as a
+    new schema in the diagnostics instead of a silent remap.
+    """
+    digest = schema_hash(columns)
+    with _mapping_lock:
+        if digest in _mappings:
+            return _mappings[digest]
+
+    cache_path = os.path.join(cache_dir_for(path), f"column-mapping-{digest[:16]}.json")
+    result = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            result = None
+    if result is None:
+        result = match_columns(columns)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        except OSError:
+            pass
+    result["schema_hash"] = digest
+
+    with _mapping_lock:
+        return _mappings.setdefault(digest, result)
+
+
+def corrected_totals(totals, counts, variant_map, co2_col):
+    """Variant totals with the per-row CO₂ correction applied.
+
+    The correction is subtracted from each row, so a variant's sum shifts by
+    the correction times its number of non-missing CO₂ rows.
+    """
+    totals = totals.copy()
+    if co2_col in totals.columns:
+        fuels = pd.Series({variant: rule['Fuel'] for variant, rule in variant_map.items()})
+        totals[co2_col] -= fuels.map(CO2_CORRECTIONS).fillna(0.0) * counts[co2_col]
+    return totals
+
+
+def monetization_cube(totals, counts, variant_map, column_mapping):
+    """External cost (€) of every variant x category x level x correction.
+
+    ``cube[v, c, l, k]`` is the cost of variant ``v`` in category ``c`` at
+    factor level ``LEVELS[l]``, without (``k=0``) or with (``k=1``) the CO₂
+    correction.
+    """
+    categories = list(column_mapping)
+    columns = [column_mapping[c] for c in categories]
+    corrected = corrected_totals(totals, counts, variant_map, column_mapping.get(CO2_CATEGORY))
+    sums = np.stack([totals[columns].to_numpy(), corrected[columns].to_numpy()], axis=-1)
+    factors = np.array([MONETIZATION_FACTORS[c] for c in categories], dtype=np.float64)
+    return {
+        "cube": sums[:, :, None, :] * factors[None, :, :, None],
+        "variants": list(totals.index),
+        "categories": categories,
+    }
+
+
+def cube_costs(cube, level, apply_adjustment=False):
+    """Variant x category cost frame for one level and correction setting."""
+    costs = cube["cube"][:, :, LEVELS.index(level), int(bool(apply_adjustment))]
+    return pd.DataFrame(costs, index=pd.Index(cube["variants"], name="Variant"),
+                        columns=pd.Index(cube["categories"], name="Impact Category"))
+
+
+def load_monetization_cube(variant_map=None, path=MASTER_PATH):
+    variant_map = load_variant_map() if variant_map is None else variant_map
+
+    def build(df):
+        return monetization_cube(load_variant_totals(variant_map, path), load_variant_counts(variant_map, path),
+                                 variant_map, load_column_mapping(df.columns, path)["mapping"])
+
+    return load_derived(("monetization_cube", tuple(variant_map)), build, path)
@@ -0,0 +1,99 @@
+"""Chunked aggregation over Parquet master tables that do not fit in memory.
+
+Inventories with millions of process rows keep the master.xlsx schema
+(``Scenario``/``Fuel``/``System``/``Process`` + impact columns) but live in
+a Parquet file. ``scan_master`` streams it in record batches and folds
+each batch into the same variant totals, process-group contribution and
+top-process results the pages compute in memory, so peak memory is
+bounded by the chunk size and the number of distinct processes, not by
+the row count.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from lca.aggregation import group_sums, group_totals_frame, variant_counts, variant_totals
+from lca.contribution import group_contribution, process_groups
+from lca.data_loader import MASTER_PATH, coerce_master, impact_columns, load_master
+from lca.heatmap import top_from_group_sums
+from lca.variants import load_variant_map, variant_rows
+
+DEFAULT_CHUNK_ROWS = 500_000
+
+
+def master_to_parquet(out, path=MASTER_PATH, row_group_rows=DEFAULT_CHUNK_ROWS):
+    """Write the typed master table at ``path`` to ``out`` for ``scan_master``."""
+    load_master(path).to_parquet(out, index=False, row_group_size=row_group_rows)
+    return out
+
+
+def iter_master_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS, columns=None):
+    """Typed master-table frames of at most ``chunk_rows`` rows each."""
+    # pre-buffering keeps every column chunk read so far alive; without it
+    # memory stays at one row group no matter how large the file is
+    parquet = pq.ParquetFile(path, pre_buffer=False)
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield coerce_master(batch.to_pandas())
+
+
+def _merge_group_sums(acc, sums, present, groups):
+    """Add one chunk's ``group_sums`` into ``acc``, growing the group axis."""
+    if acc is None:
+        return {"sums": sums, "present": present, "groups": groups}
+    positions = acc["groups"].get_indexer(groups)
+    new = positions < 0
+    if new.any():
+        grow = int(new.sum())
+        positions[new] = np.arange(len(acc["groups"]), len(acc["groups"]) + grow)
+        acc["groups"] = acc["groups"].append(groups[new])
+        acc["sums"] = np.pad(acc["sums"], ((0, 0), (0, grow), (0, 0)))
+        acc["present"] = np.pad(acc["present"], ((0, 0), (0, grow)))
+    acc["sums"][:, positions] += sums
+    acc["present"][:, positions] |= present
+    return acc
+
+
+def _sorted_group_sums(acc, columns):
+    """``group_sums``-shaped result with groups sorted like ``groupby``."""
+    groups, order = acc["groups"].sort_values(return_indexer=True)
+    return acc["sums"][:, order], acc["present"][:, order], groups, columns
+
+
+def scan_master(path, variant_map=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Overview, Contribution and Heatmap aggregations in one streaming pass.
+
+    Returns a dict with ``totals`` and ``counts`` (variant x impact),
+    ``group_totals`` and ``contribution`` (indexed by Variant and Group) and
+    ``top_processes`` (impact x variant), equal to the in-memory functions
+    applied to the whole table, plus the ``rows`` and ``chunks`` scanned.
+    """
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    totals = counts = by_group = by_process = columns = None
+    rows = chunks = 0
+    for chunk in iter_master_chunks(path, chunk_rows):
+        if columns is None:
+            columns = impact_columns(chunk)
+        rows += len(chunk)
+        chunks += 1
+        rows_by_variant = variant_rows(chunk, variant_map)
+        chunk_totals = variant_totals(chunk, variant_map, rows_by_variant).to_numpy()
+        chunk_counts = variant_counts(chunk, variant_map, rows_by_variant).to_numpy()
+        totals = chunk_totals if totals is None else totals + chunk_totals
+        counts = chunk_counts if counts is None else counts + chunk_counts
+        by_group = _merge_group_sums(
+            by_group, *group_sums(chunk, variant_map, process_groups(chunk), rows_by_variant)[:3])
+        by_process = _merge_group_sums(by_process, *group_sums(chunk, variant_map, "Process", rows_by_variant)[:3])
+    if columns is None:
+        raise ValueError(f"{path} has no rows")
+
+    index = pd.Index(list(variant_map), name="Variant")
+    group_totals = group_totals_frame(*_sorted_group_sums(by_group, columns), variant_map)
+    return {
+        "rows": rows,
+        "chunks": chunks,
+        "totals": pd.DataFrame(totals, index=index, columns=columns),
+        "counts": pd.DataFrame(counts, index=index, columns=columns),
+        "group_totals": group_totals,
+        "contribution": group_contribution(group_totals),
+        "top_processes": top_from_group_sums(*_sorted_group_sums(by_process, columns), variant_map),
+    }
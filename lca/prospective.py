@@ -0,0 +1,148 @@
+"""Prospective climate-impact trajectories for any year grid and custom scenarios.
+
+The master table is the base year (2020): every variant's climate-change
+total split by process group. A scenario is a set of time-dependent scaling
+factors applied to that split:
+
+* the IAM scenarios (Optimistic/Middle/Pessimistic CSVs) are taken as
+  anchor values per variant, so the engine reproduces the CSVs at their
+  5-year anchors;
+* a custom scenario gives one factor per process group and anchor year,
+  e.g. a faster-decarbonising conversion step. Where a CSV base year
+  differs from the master total, the variant's split is rescaled to the
+  CSV value so custom and IAM scenarios start from the same point.
+
+Anchors are interpolated linearly onto the requested year grid with one
+weight matrix, and all variants and scenarios are computed as a few array
+products. Results come back in the same store layout as
+``lca.scenarios.build_scenario_store``, so every store helper applies.
+"""
+import hashlib
+import json
+
+import numpy as np
+
+from lca.contribution import load_group_totals
+from lca.data_loader import MASTER_PATH, load_sweep
+from lca.scenarios import MAX_YEAR, SCENARIO_FILES, load_scenario_store
+from lca.variants import load_variant_map
+
+IMPACT_COLUMN = "Climate change (kg CO₂ eq.)"
+BASE_YEAR = 2020
+YEAR_STEPS = [1, 0.5, 0.25, 5]
+
+
+def year_grid(step=1, start=BASE_YEAR, end=MAX_YEAR):
+    """Years from ``start`` to ``end`` inclusive in steps of ``step`` years."""
+    count = int(round((end - start) / step)) + 1
+    years = np.round(start + step * np.arange(count), 6)
+    return years.astype(int) if float(step).is_integer() else years
+
+
+def interpolation_weights(anchors, years):
+    """Years x anchors matrix of linear interpolation weights.
+
+    Years outside the anchor range hold the nearest anchor value.
+    """
+    anchors = np.asarray(anchors, dtype=np.float64)
+    years = np.clip(np.asarray(years, dtype=np.float64), anchors[0], anchors[-1])
+    upper = np.clip(np.searchsorted(anchors, years, side="right"), 1, len(anchors) - 1)
+    lower = upper - 1
+    span = anchors[upper] - anchors[lower]
+    t = np.where(span > 0, (years - anchors[lower]) / np.where(span > 0, span, 1.0), 0.0)
+    weights = np.zeros((len(years), len(anchors)))
+    weights[np.arange(len(years)), lower] = 1 - t
+    weights[np.arange(len(years)), upper] += t
+    if len(anchors) == 1:
+        weights[:, 0] = 1.0
+    return weights
+
+
+def base_split(group_totals, variants, column=IMPACT_COLUMN):
+    """Variant x group base-year matrix and the group names, NaN for unknown variants."""
+    split = group_totals[column].unstack(fill_value=0.0)
+    return split.reindex(index=variants).to_numpy(dtype=np.float64), list(split.columns)
+
+
+def iam_trajectories(store, years):
+    """Scenario x year x variant values of the IAM store on ``years``.
+
+    Each series is interpolated over its own finite anchors, so a value a
+    CSV lacks only widens the gap between its neighbours; a series with no
+    finite anchor stays NaN.
+    """
+    anchors = store["years"].astype(np.float64)
+    values = store["values"]
+    finite = np.isfinite(values)
+    weights = interpolation_weights(anchors, years)
+    result = np.einsum("ya,sav->syv", weights, np.where(finite, values, 0.0))
+    for s, v in zip(*np.nonzero(~finite.all(axis=1))):
+        known = finite[s, :, v]
+        result[s, :, v] = (
+            np.interp(years, anchors[known], values[s, known, v]) if known.any() else np.nan
+        )
+    return result
+
+
+def calibrate_split(base, store):
+    """Rescale each variant's split to the IAM base-year value where there is one."""
+    if not store["scenarios"] or BASE_YEAR not in store["years"]:
+        return base
+    with np.errstate(all="ignore"):
+        target = np.nanmean(store["values"][:, list(store["years"]).index(BASE_YEAR)], axis=0)
+        ratio = target / base.sum(axis=1)
+    return base * np.where(np.isfinite(ratio), ratio, 1.0)[:, None]
+
+
+def custom_trajectory(spec, base, groups, years):
+    """Year x variant values of one custom scenario.
+
+    ``spec["anchors"]`` maps anchor years to ``{group: factor}``; groups
+    left out keep factor 1, and the base year is factor 1 for all groups
+    unless given.
+    """
+    anchors = {float(BASE_YEAR): {}}
+    anchors.update({float(year): factors for year, factors in spec["anchors"].items()})
+    anchor_years = sorted(anchors)
+    factors = np.array([[float(anchors[y].get(g, 1.0)) for g in groups] for y in anchor_years])
+    return interpolation_weights(anchor_years, years) @ factors @ base.T
+
+
+def build_prospective_store(scenario_store, group_totals, step=1, custom=()):
+    """Store of IAM and custom scenario trajectories on a ``step``-year grid."""
+    years = year_grid(step)
+    variants = scenario_store["variants"]
+    base, groups = base_split(group_totals, variants)
+    base = calibrate_split(base, scenario_store)
+    blocks, names = [], []
+    if scenario_store["scenarios"]:
+        blocks.append(iam_trajectories(scenario_store, years))
+        names.extend(scenario_store["scenarios"])
+    for spec in custom:
+        blocks.append(custom_trajectory(spec, base, groups, years)[None])
+        names.append(spec["name"])
+
+    digest = hashlib.sha256(json.dumps(
+        [scenario_store["hash"], step, list(custom)], sort_keys=True, default=str
+    ).encode("utf-8"))
+    digest.update(np.ascontiguousarray(base).tobytes())
+    return {
+        "scenarios": names,
+        "years": years,
+        "variants": variants,
+        "values": np.concatenate(blocks) if blocks else np.empty((0, len(years), len(variants))),
+        "missing": scenario_store["missing"],
+        "hash": digest.hexdigest(),
+    }
+
+
+def load_prospective_store(step=1, custom=(), scenario_paths=SCENARIO_FILES, path=MASTER_PATH):
+    """``build_prospective_store`` cached per master snapshot, CSV versions, grid and custom specs."""
+    scenario_store = load_scenario_store(scenario_paths)
+    variant_map = load_variant_map()
+    key = json.dumps(list(custom), sort_keys=True, default=str)
+    return load_sweep(
+        ("prospective", scenario_store["hash"], step, key),
+        lambda df: build_prospective_store(scenario_store, load_group_totals(variant_map, path), step, custom),
+        path
+    )
@@ -0,0 +1,88 @@
+"""Multi-criteria ranking of variants across all impact categories.
+
+Every impact column is treated as "lower is better". The weight-independent
+part (min-max normalised matrix, pairwise dominance, Pareto fronts) is built
+once per loaded master table; a weighted-sum ranking is then one
+matrix-vector product, so weight sliders do not touch the aggregation.
+"""
+import numpy as np
+import pandas as pd
+
+from lca.aggregation import load_variant_totals, variant_key
+from lca.data_loader import MASTER_PATH, load_derived
+from lca.variants import load_variant_map
+
+
+def normalize(values):
+    """Min-max scale each column to [0, 1]; constant or all-NaN columns become 0."""
+    low = np.nanmin(values, axis=0, initial=np.inf, where=~np.isnan(values))
+    high = np.nanmax(values, axis=0, initial=-np.inf, where=~np.isnan(values))
+    span = high - low
+    span[~np.isfinite(span) | (span == 0)] = np.inf
+    return np.nan_to_num((values - low) / span, nan=1.0, posinf=0.0, neginf=0.0)
+
+
+def dominance_matrix(values):
+    """``D[a, b]`` is True when variant ``a`` Pareto-dominates variant ``b``.
+
+    ``a`` dominates ``b`` when it is no worse in every column and strictly
+    better in at least one. NaN counts as worst.
+    """
+    values = np.where(np.isnan(values), np.inf, values)
+    no_worse = (values[:, None, :] <= values[None, :, :]).all(axis=2)
+    better = (values[:, None, :] < values[None, :, :]).any(axis=2)
+    return no_worse & better
+
+
+def pareto_fronts(dominates):
+    """Front number per variant (1 = non-dominated) by peeling the dominance matrix."""
+    remaining = dominates.sum(axis=0)
+    fronts = np.zeros(len(dominates), dtype=np.int64)
+    front = 0
+    while (fronts == 0).any():
+        front += 1
+        current = (fronts == 0) & (remaining == 0)
+        fronts[current] = front
+        remaining = remaining - dominates[current].sum(axis=0)
+    return fronts
+
+
+def ranking_base(totals):
+    """Weight-independent ranking inputs for a variant x impact frame."""
+    values = totals.to_numpy(dtype=np.float64)
+    dominates = dominance_matrix(values)
+    return {
+        "variants": list(totals.index),
+        "columns": list(totals.columns),
+        "normalized": normalize(values),
+        "front": pareto_fronts(dominates),
+        "dominates": dominates.sum(axis=1),
+        "dominated_by": dominates.sum(axis=0),
+    }
+
+
+def rank_variants(base, weights=None):
+    """Ranking table: Pareto front, dominance counts and weighted-sum score.
+
+    ``weights`` maps impact columns to non-negative weights (missing columns
+    get 0; ``None`` weighs all columns equally). The score is the weighted
+    mean of the normalised impacts, so 0 is best in every weighted category.
+    """
+    columns = base["columns"]
+    w = np.ones(len(columns)) if weights is None else np.array([float(weights.get(c, 0.0)) for c in columns])
+    score = base["normalized"] @ w / w.sum() if w.sum() > 0 else np.zeros(len(base["variants"]))
+    table = pd.DataFrame({
+        "Variant": base["variants"],
+        "Pareto front": base["front"],
+        "Dominates": base["dominates"],
+        "Dominated by": base["dominated_by"],
+        "Weighted score": score,
+    })
+    table["Rank"] = table["Weighted score"].rank(method="min").astype(int)
+    return table.sort_values(["Rank", "Pareto front", "Variant"], ignore_index=True)
+
+
+def load_ranking_base(variant_map=None, path=MASTER_PATH):
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    return load_derived(("ranking_base", variant_key(variant_map)),
+                        lambda df: ranking_base(load_variant_totals(variant_map, path)), path)
@@ -0,0 +1,155 @@
+"""Multi-fuel scenario grid for the Prospective page.
+
+Both renderings read from the scenario store. The 4x4 Matplotlib grid is
+rendered to PNG once per scenario store hash and kept in memory and in the
+master workbook's cache directory. ``build_grid_figure`` is a single
+faceted Plotly figure with the same layout for interactive use. Matplotlib
+and Plotly are only imported when a grid is actually rendered.
+"""
+import glob
+import io
+import os
+import threading
+
+from lca.data_loader import MASTER_PATH, cache_dir_for
+from lca.instrumentation import record_cache, timed
+from lca.scenarios import store_range
+from lca.variants import fuel_label_colors, fuel_of, fuel_sort_key
+
+SCENARIO_COLORS = {"Optimistic": "green", "Middle": "black", "Pessimistic": "red"}
+SCENARIO_LINESTYLES = {"Optimistic": "solid", "Middle": "dashed", "Pessimistic": "dotted"}
+JET_FUEL_BASELINE = 4.127
+RED_III_TARGET = 1.238
+GRID_COLUMNS = 4
+# rendered grids kept on disk, newest first; one per custom-scenario edit
+MAX_GRID_FILES = 8
+
+_lock = threading.Lock()
+_pngs = {}
+
+
+def grid_columns(store):
+    return sorted(store["variants"], key=fuel_sort_key)
+
+
+def label_color(fuel_name):
+    return fuel_label_colors().get(fuel_of(fuel_name), "black")
+
+
+def render_grid_png(store, dpi=100):
+    from matplotlib.figure import Figure
+    from matplotlib.gridspec import GridSpec
+
+    fuel_columns = grid_columns(store)
+    ymin, ymax = store_range(store)
+    rows = -(-len(fuel_columns) // GRID_COLUMNS)
+    years = store["years"]
+
+    fig = Figure(figsize=(30, 15))
+    gs = GridSpec(rows, GRID_COLUMNS, figure=fig, wspace=0.3, hspace=0.4)
+    for i, fuel in enumerate(fuel_columns):
+        row, col = divmod(i, GRID_COLUMNS)
+        ax = fig.add_subplot(gs[row, col])
+        j = store["variants"].index(fuel)
+        for s, scenario in enumerate(store["scenarios"]):
+            ax.plot(
+                years, store["values"][s, :, j],
+                label=scenario,
+                color=SCENARIO_COLORS.get(scenario, "blue"),
+                linestyle=SCENARIO_LINESTYLES.get(scenario, "solid")
+            )
+        ax.axhline(y=JET_FUEL_BASELINE, color="gray", linestyle="solid", linewidth=1)
+        ax.axhline(y=RED_III_TARGET, color="black", linestyle="dashdot", linewidth=1)
+        ax.text(2021, 4.25, "Jet Fuel Baseline", fontsize=10, color="gray")
+        ax.text(2021, 1.45, "RED III Target", fontsize=10, color="black")
+        ax.set_title(fuel, fontsize=14, color=label_color(fuel))
+        ax.set_ylim(ymin, ymax)
+        ax.set_xlabel("Year", fontsize=14)
+        ax.set_ylabel("kg CO₂-eq/kg fuel", fontsize=14)
+        ax.tick_params(axis='both', labelsize=8)
+        ax.grid(True)
+
+    fig.legend(store["scenarios"], loc="upper center", ncol=len(store["scenarios"]))
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _prune_grid_files(directory, keep=MAX_GRID_FILES):
+    paths = sorted(glob.glob(os.path.join(directory, "scenario-grid-*.png")), key=os.path.getmtime, reverse=True)
+    for old in paths[keep:]:
+        os.remove(old)
+
+
+def load_grid_png(store, path=MASTER_PATH):
+    """PNG bytes of the grid, rendered once per scenario store hash.
+
+    The file is kept in ``cache_dir_for(path)`` with the other caches.
+    """
+    content_hash = store["hash"]
+    with _lock:
+        png = _pngs.get(content_hash)
+    record_cache("grid_png", "scenario_grid", png is not None)
+    if png is not None:
+        return png
+
+    cache_path = os.path.join(cache_dir_for(path), f"scenario-grid-{content_hash[:16]}.png")
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            png = f.read()
+    else:
+        with timed("scenario_grid", "figure"):
+            png = render_grid_png(store)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "wb") as f:
+                f.write(png)
+            _prune_grid_files(os.path.dirname(cache_path))
+        except OSError:
+            pass
+
+    with _lock:
+        # only the latest scenario set is worth keeping in memory
+        _pngs.clear()
+        _pngs[content_hash] = png
+        return png
+
+
+def build_grid_figure(store):
+    """The same grid as one faceted Plotly figure."""
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+
+    fuel_columns = grid_columns(store)
+    ymin, ymax = store_range(store)
+    years = store["years"]
+    rows = -(-len(fuel_columns) // GRID_COLUMNS)
+    dash = {"solid": "solid", "dashed": "dash", "dotted": "dot"}
+
+    fig = make_subplots(
+        rows=rows, cols=GRID_COLUMNS,
+        subplot_titles=[f"<span style='color:{label_color(f)}'>{f}</span>" for f in fuel_columns],
+        shared_yaxes=True, horizontal_spacing=0.03, vertical_spacing=0.08
+    )
+    for i, fuel in enumerate(fuel_columns):
+        row, col = divmod(i, GRID_COLUMNS)
+        j = store["variants"].index(fuel)
+        for s, scenario in enumerate(store["scenarios"]):
+            fig.add_trace(go.Scatter(
+                x=years, y=store["values"][s, :, j],
+                name=scenario, legendgroup=scenario, showlegend=(i == 0),
+                mode="lines",
+                line=dict(color=SCENARIO_COLORS.get(scenario, "blue"),
+                          dash=dash[SCENARIO_LINESTYLES.get(scenario, "solid")])
+            ), row=row + 1, col=col + 1)
+
+    fig.add_hline(y=JET_FUEL_BASELINE, line_color="gray", line_width=1, row="all", col="all")
+    fig.add_hline(y=RED_III_TARGET, line_color="black", line_dash="dashdot", line_width=1, row="all", col="all")
+    fig.update_yaxes(range=[ymin, ymax])
+    fig.update_yaxes(title_text="kg CO₂-eq/kg fuel", col=1)
+    fig.update_layout(
+        height=250 * rows,
+        legend=dict(orientation="h", yanchor="bottom", y=1.04, xanchor="center", x=0.5),
+        margin=dict(t=80)
+    )
+    return fig
@@ -0,0 +1,117 @@
+"""Prospective scenario trajectories from the Optimistic/Middle/Pessimistic CSVs.
+
+All scenario files are read once per set of file versions into one store:
+a ``(scenario, year, variant)`` float block plus its axis labels. Slices,
+value ranges and chart series are taken from that block directly.
+"""
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from lca.data_loader import file_fingerprint, file_hash
+from lca.instrumentation import record_cache, timed
+
+SCENARIO_FILES = ["Optimistic.csv", "Middle.csv", "Pessimistic.csv"]
+MAX_YEAR = 2050
+
+_lock = threading.Lock()
+_stores = {}
+
+
+def scenario_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def load_scenario(path):
+    df_csv = pd.read_csv(path)
+    return df_csv[df_csv["Year"] <= MAX_YEAR]
+
+
+def build_scenario_store(paths):
+    """Read the scenario CSVs in ``paths`` into one aligned block.
+
+    Years and variants are the union over all files (in first-seen order for
+    variants, sorted for years); values a file does not have are NaN.
+    """
+    frames, missing = {}, []
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            frames[scenario_name(path)] = load_scenario(path).set_index("Year")
+        except FileNotFoundError:
+            missing.append(path)
+            continue
+        digest.update(os.path.basename(path).encode("utf-8"))
+        digest.update(file_hash(path).encode("ascii"))
+
+    years = sorted(set().union(*(df.index for df in frames.values()))) if frames else []
+    variants = list(dict.fromkeys(col for df in frames.values() for col in df.columns))
+    values = np.full((len(frames), len(years), len(variants)), np.nan)
+    for i, df in enumerate(frames.values()):
+        values[i] = df.reindex(index=years, columns=variants).to_numpy(dtype=np.float64)
+
+    return {
+        "scenarios": list(frames),
+        "years": np.asarray(years),
+        "variants": variants,
+        "values": values,
+        "missing": missing,
+        "hash": digest.hexdigest(),
+    }
+
+
+def load_scenario_store(paths=SCENARIO_FILES):
+    """``build_scenario_store`` memoized on the files' mtimes and sizes."""
+    paths = tuple(paths)
+    key = tuple(
+        (os.path.abspath(p), file_fingerprint(p) if os.path.exists(p) else None) for p in paths
+    )
+    with _lock:
+        cached = _stores.get(paths)
+        hit = cached is not None and cached[0] == key
+    record_cache("scenarios", "scenario_store", hit)
+    if hit:
+        return cached[1]
+    with timed("scenario CSVs", "load"):
+        store = build_scenario_store(paths)
+    with _lock:
+        _stores[paths] = (key, store)
+    return store
+
+
+def store_slice(store, scenarios=None, variants=None):
+    """Sub-block for the given scenario and variant names (all by default)."""
+    s_idx = [store["scenarios"].index(s) for s in scenarios] if scenarios is not None else slice(None)
+    v_idx = [store["variants"].index(v) for v in variants] if variants is not None else slice(None)
+    return store["values"][s_idx][:, :, v_idx]
+
+
+def store_range(store, variants=None):
+    """(min, max) over every scenario and year for ``variants``."""
+    values = store_slice(store, variants=variants)
+    return float(np.nanmin(values)), float(np.nanmax(values))
+
+
+def line_series(store, scenarios, variants):
+    """``(name, scenario, values)`` per scenario x variant, NaN as ``None``."""
+    block = store_slice(store, scenarios, variants)
+    data = np.where(np.isnan(block), None, block).astype(object)
+    return [
+        (f"{scenario} - {variant}", scenario, data[i, :, j].tolist())
+        for i, scenario in enumerate(scenarios)
+        for j, variant in enumerate(variants)
+    ]
+
+
+def scenario_trends(store):
+    """Long (Scenario, Year, Variant, Value) frame from the store."""
+    n_scenarios, n_years, n_variants = store["values"].shape
+    return pd.DataFrame({
+        "Scenario": np.repeat(store["scenarios"], n_years * n_variants),
+        "Year": np.tile(np.repeat(store["years"], n_variants), n_scenarios),
+        "Variant": np.tile(store["variants"], n_scenarios * n_years),
+        "Value": store["values"].ravel(),
+    })
@@ -0,0 +1,153 @@
+"""Global sensitivity of monetized costs to the monetization factors.
+
+Each factor is uniform on [0, 1] mapped through the triangular
+distribution over its Low/Central/High values (as in ``lca.uncertainty``).
+A sample of factors is evaluated for all variants with one matrix product
+against the variant x category totals, so the pandas pipeline runs once
+per dataset and not once per sample.
+
+* ``sobol_indices``: first-order (S1) and total (ST) Sobol indices with the
+  Saltelli/Jansen estimators, accumulated over chunks of base samples,
+  optionally on a process pool. ``linear_shares`` gives the closed-form
+  values they converge to, since the cost is linear in the factors.
+* ``morris_screening``: mean absolute (mu*) and standard deviation (sigma)
+  of elementary effects on a ``levels``-grid, in € per full factor range.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from lca.aggregation import load_variant_counts, load_variant_totals, variant_key
+from lca.data_loader import MASTER_PATH, load_sweep
+from lca.monetization import CO2_CATEGORY, MONETIZATION_FACTORS, corrected_totals, load_column_mapping
+from lca.uncertainty import triangular
+from lca.variants import load_variant_map
+
+METHODS = ["Sobol", "Morris"]
+DEFAULT_SAMPLES = 8192
+DEFAULT_TRAJECTORIES = 200
+CHUNK_SAMPLES = 4096
+
+
+def sensitivity_inputs(totals, counts, variant_map, column_mapping, apply_adjustment=False):
+    """Variant x category totals and the factor ranges they are weighted with."""
+    categories = list(column_mapping)
+    columns = [column_mapping[c] for c in categories]
+    if apply_adjustment:
+        totals = corrected_totals(totals, counts, variant_map, column_mapping.get(CO2_CATEGORY))
+    low, mode, high = np.array([MONETIZATION_FACTORS[c] for c in categories], dtype=np.float64).T
+    return {
+        "totals": totals[columns].to_numpy(dtype=np.float64),
+        "ranges": (low, mode, high),
+        "variants": list(totals.index),
+        "categories": categories,
+    }
+
+
+def evaluate(inputs, unit):
+    """Total cost of every variant for ``unit`` samples (... x factors in [0, 1])."""
+    factors = triangular(unit, *inputs["ranges"])
+    return factors @ inputs["totals"].T
+
+
+def mean_cost(inputs):
+    """Expected total cost of every variant (the triangular means times the totals)."""
+    return (sum(inputs["ranges"]) / 3) @ inputs["totals"].T
+
+
+def linear_shares(inputs):
+    """Closed-form S1 (= ST) per variant and category of the linear cost model."""
+    low, mode, high = inputs["ranges"]
+    factor_var = (low ** 2 + mode ** 2 + high ** 2 - low * mode - low * high - mode * high) / 18
+    parts = inputs["totals"] ** 2 * factor_var
+    total = parts.sum(axis=1, keepdims=True)
+    shares = parts / np.where(total > 0, total, np.nan)
+    return _long_frame(inputs, {"S1": shares.T, "ST": shares.T})
+
+
+def _sobol_chunk(inputs, size, seed, shift):
+    rng = np.random.default_rng(seed)
+    k = len(inputs["categories"])
+    a, b = rng.random((size, k)), rng.random((size, k))
+    ab = np.repeat(a[None], k, axis=0)
+    ab[np.arange(k), :, np.arange(k)] = b.T
+    # centred on the expected cost: the S1 products are otherwise dominated
+    # by the mean and their noise swamps small shares
+    f_a, f_b, f_ab = (evaluate(inputs, u) - shift for u in (a, b, ab))
+    return {
+        "n": size,
+        "sum": f_a.sum(axis=0) + f_b.sum(axis=0),
+        "sum_sq": (f_a ** 2).sum(axis=0) + (f_b ** 2).sum(axis=0),
+        "first": (f_b[None] * (f_ab - f_a[None])).sum(axis=1),
+        "total": ((f_a[None] - f_ab) ** 2).sum(axis=1),
+    }
+
+
+def sobol_indices(inputs, samples=DEFAULT_SAMPLES, seed=0, workers=1):
+    """Long frame of S1 and ST per variant and category.
+
+    ``samples`` base samples cost ``samples * (k + 2)`` model evaluations for
+    ``k`` factors. Chunks are independent, so ``workers > 1`` spreads them
+    over a process pool without changing the result.
+    """
+    sizes = [min(CHUNK_SAMPLES, samples - start) for start in range(0, samples, CHUNK_SAMPLES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    shift = mean_cost(inputs)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_sobol_chunk, [inputs] * len(sizes), sizes, seeds, [shift] * len(sizes)))
+    else:
+        parts = [_sobol_chunk(inputs, size, s, shift) for size, s in zip(sizes, seeds)]
+
+    n = sum(p["n"] for p in parts)
+    mean = sum(p["sum"] for p in parts) / (2 * n)  # of the centred costs
+    variance = sum(p["sum_sq"] for p in parts) / (2 * n) - mean ** 2
+    safe = np.where(variance > 0, variance, np.nan)
+    first = sum(p["first"] for p in parts) / n / safe
+    total = sum(p["total"] for p in parts) / (2 * n) / safe
+    return _long_frame(inputs, {"S1": first, "ST": total})
+
+
+def morris_screening(inputs, trajectories=DEFAULT_TRAJECTORIES, levels=4, seed=0):
+    """Long frame of mu* and sigma of the elementary effects per variant and category."""
+    rng = np.random.default_rng(seed)
+    k = len(inputs["categories"])
+    delta = levels / (2 * (levels - 1))
+    # random start points on the grid that leave room for a +delta step
+    start = rng.integers(0, levels // 2, (trajectories, k)) / (levels - 1)
+    order = np.argsort(rng.random((trajectories, k)), axis=1)
+    steps = np.zeros((trajectories, k + 1, k))
+    for j in range(k):
+        steps[np.arange(trajectories), j + 1:, order[:, j]] = delta
+    points = start[:, None, :] + steps
+    costs = evaluate(inputs, points)
+    effects = np.empty((trajectories, k, costs.shape[-1]))
+    effects[np.arange(trajectories)[:, None], order] = (costs[:, 1:] - costs[:, :-1]) / delta
+    return _long_frame(inputs, {"mu_star": np.abs(effects).mean(axis=0), "sigma": effects.std(axis=0, ddof=1)})
+
+
+def _long_frame(inputs, measures):
+    index = pd.MultiIndex.from_product([inputs["categories"], inputs["variants"]],
+                                       names=["Impact Category", "Variant"])
+    frame = pd.DataFrame({name: np.nan_to_num(values).ravel() for name, values in measures.items()}, index=index)
+    return frame.swaplevel().sort_index(level="Variant", sort_remaining=False).reset_index()
+
+
+def load_sensitivity(method="Sobol", variant_map=None, apply_adjustment=False, samples=None, seed=0,
+                     path=MASTER_PATH):
+    """``sobol_indices`` or ``morris_screening`` cached per loaded master snapshot."""
+    variant_map = load_variant_map() if variant_map is None else variant_map
+
+    def build(df):
+        inputs = sensitivity_inputs(load_variant_totals(variant_map, path), load_variant_counts(variant_map, path),
+                                    variant_map, load_column_mapping(df.columns, path)["mapping"],
+                                    apply_adjustment)
+        if method == "Sobol":
+            return sobol_indices(inputs, samples or DEFAULT_SAMPLES, seed)
+        return morris_screening(inputs, samples or DEFAULT_TRAJECTORIES, seed=seed)
+
+    if method not in METHODS:
+        raise ValueError(f"Unknown sensitivity method {method!r}")
+    return load_sweep(("sensitivity", method, variant_key(variant_map), bool(apply_adjustment), samples, seed),
+                      build, path)
@@ -0,0 +1,39 @@
+"""Skeleton placeholders shown while ``lca.warmup`` loads the data."""
+import time
+
+import streamlit as st
+
+from lca.warmup import warmup_status
+
+POLL_SECONDS = 0.1
+
+_BLOCK = (
+    '<div style="height:{height}px;margin:0 0 1rem;border-radius:0.5rem;'
+    'background:linear-gradient(90deg,rgba(128,128,128,.12),rgba(128,128,128,.24),rgba(128,128,128,.12));'
+    'background-size:200% 100%;animation:lca-shimmer 1.4s ease-in-out infinite"></div>'
+)
+_STYLE = "<style>@keyframes lca-shimmer{0%{background-position:100% 0}100%{background-position:-100% 0}}</style>"
+
+
+def wait_for_data(heights=(420, 160)):
+    """Show chart/table-shaped placeholders until the warm-up has finished.
+
+    Returns at once when the data is already warm or no warm-up is running;
+    a failed warm-up also returns, so the page's own loaders raise the error.
+    """
+    status = warmup_status()
+    if status["state"] != "running":
+        return
+    placeholder = st.empty()
+    with placeholder.container():
+        progress = st.progress(0.0, text="⏳ Loading data …")
+        st.markdown(_STYLE + "".join(_BLOCK.format(height=h) for h in heights), unsafe_allow_html=True)
+    while status["state"] == "running":
+        done = status["steps"]
+        progress.progress(
+            len(done) / max(status["total"], 1),
+            text=f"⏳ Loading data … ({done[-1]['step']} ready)" if done else "⏳ Loading data …"
+        )
+        time.sleep(POLL_SECONDS)
+        status = warmup_status()
+    placeholder.empty()
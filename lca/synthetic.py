@@ -0,0 +1,52 @@
+"""Synthetic master tables at inventory scale, for benchmarks.
+
+Rows are resampled from a template (the shipped master.xlsx by default), so
+fuels, scenarios, systems and impact columns keep the real schema and value
+ranges. Each sampled process is split into ``process_variants`` numbered
+copies to get ecoinvent-like counts of distinct processes, and impact values
+get multiplicative log-normal noise.
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from lca.data_loader import ID_COLUMNS, MASTER_PATH, impact_columns, load_master
+
+DEFAULT_PROCESS_VARIANTS = 1000
+CHUNK_ROWS = 1_000_000
+
+
+def synthetic_master(rows, template=None, seed=0, process_variants=DEFAULT_PROCESS_VARIANTS):
+    """Frame of ``rows`` synthetic rows with the template's columns and dtypes."""
+    template = load_master(MASTER_PATH) if template is None else template
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(template), rows)
+    sample = template.iloc[picks]
+    df = sample[ID_COLUMNS].reset_index(drop=True)
+    copies = rng.integers(0, process_variants, rows).astype(str)
+    df["Process"] = (df["Process"].astype(str) + " #").str.cat(copies)
+    columns = impact_columns(template)
+    noise = rng.lognormal(0.0, 0.3, size=(rows, len(columns)))
+    df[columns] = sample[columns].to_numpy(dtype=np.float64) * noise
+    return df
+
+
+def write_synthetic_parquet(out, rows, template=None, seed=0,
+                            process_variants=DEFAULT_PROCESS_VARIANTS, chunk_rows=CHUNK_ROWS):
+    """Write ``rows`` synthetic rows to ``out`` one chunk at a time.
+
+    Memory stays bounded by ``chunk_rows``; every chunk becomes a row group.
+    """
+    template = load_master(MASTER_PATH) if template is None else template
+    writer = None
+    try:
+        for i, start in enumerate(range(0, rows, chunk_rows)):
+            chunk = synthetic_master(min(chunk_rows, rows - start), template, seed + i, process_variants)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return out
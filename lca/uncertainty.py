@@ -0,0 +1,162 @@
+"""Monte Carlo propagation of monetization factor and impact uncertainty.
+
+Monetization factors are drawn from triangular distributions over their
+Low/Central/High values, and impact values can get multiplicative
+log-normal noise per row (geometric standard deviation ``gsd``). Draws are
+processed in chunks of a few NumPy batch operations each: row noise,
+variant sums over the membership pairs, factor weighting. The chunks run on a
+thread pool; NumPy releases the GIL for this work, so the inputs are not
+pickled and the pool works inside the Streamlit server.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from lca.aggregation import load_variant_rows, membership_pairs, pair_sums, variant_key
+from lca.data_loader import MASTER_PATH, load_sweep
+from lca.monetization import CO2_CATEGORY, CO2_CORRECTIONS, MONETIZATION_FACTORS, load_column_mapping
+from lca.variants import load_variant_map
+
+PERCENTILES = [5, 25, 50, 75, 95]
+DEFAULT_DRAWS = 100_000
+# draws x membership pairs x columns held by one chunk when rows get their own noise
+CHUNK_ELEMENTS = 4_000_000
+
+
+def triangular(u, low, mode, high):
+    """Inverse CDF of the triangular distribution; a zero-width range gives ``mode``."""
+    width = high - low
+    safe = np.where(width > 0, width, 1.0)
+    left = low + np.sqrt(u * safe * (mode - low))
+    right = high - np.sqrt((1 - u) * safe * (high - mode))
+    return np.where(width > 0, np.where(u * safe < mode - low, left, right), mode)
+
+
+def propagation_inputs(df, variant_map, columns, rows=None):
+    """Membership pairs (``membership_pairs``), row values (NaN as 0) and non-missing mask."""
+    raw = df[columns].to_numpy(dtype=np.float64)
+    variant_idx, row_idx = membership_pairs(df, variant_map, rows)
+    return {
+        "variant_idx": variant_idx,
+        "row_idx": row_idx,
+        "variants": len(variant_map),
+        "values": np.nan_to_num(raw),
+        "present": ~np.isnan(raw),
+    }
+
+
+def _noisy_sums(inputs, values):
+    """draws x variant x column sums of draws x row x column ``values``."""
+    variant_idx, row_idx = inputs["variant_idx"], inputs["row_idx"]
+    totals = np.zeros((len(values), inputs["variants"], values.shape[2]))
+    if len(row_idx):
+        # pairs are ordered by variant, so each variant is one contiguous run
+        used, starts = np.unique(variant_idx, return_index=True)
+        totals[:, used] = np.add.reduceat(values[:, row_idx], starts, axis=1)
+    return totals
+
+
+def _simulate_chunk(inputs, draws, seed, factor_ranges, offsets, gsd):
+    rng = np.random.default_rng(seed)
+    values = inputs["values"]
+    if gsd > 1:
+        noise = rng.lognormal(0.0, np.log(gsd), size=(draws,) + values.shape)
+        totals = _noisy_sums(inputs, values * noise)
+    else:
+        sums = pair_sums(inputs["variant_idx"], inputs["row_idx"], values, inputs["variants"])
+        totals = np.broadcast_to(sums, (draws,) + sums.shape)
+    totals = totals - offsets
+    if factor_ranges is None:
+        return totals
+    low, mode, high = factor_ranges
+    factors = triangular(rng.random((draws, len(mode))), low, mode, high)
+    return np.einsum("dvc,dc->dv", totals, factors)
+
+
+def simulate(inputs, draws=DEFAULT_DRAWS, factor_ranges=None, offsets=None, gsd=1.0, seed=0, workers=None):
+    """Sampled variant results for ``draws`` draws.
+
+    Without ``factor_ranges`` the result is draws x variant x column totals;
+    with ``(low, mode, high)`` factor arrays it is the draws x variant sum of
+    factor-weighted costs. ``offsets`` (variant x column) are subtracted
+    from the totals before weighting. Chunks get independent seeds spawned
+    from ``seed``, so results do not depend on ``workers``.
+    """
+    n_rows, n_columns = inputs["values"].shape
+    per_draw = (n_rows + len(inputs["row_idx"])) * n_columns if gsd > 1 else inputs["variants"] * n_columns
+    chunk = max(1, CHUNK_ELEMENTS // max(1, per_draw))
+    sizes = [min(chunk, draws - start) for start in range(0, draws, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    offsets = 0.0 if offsets is None else offsets
+    workers = min(len(sizes), os.cpu_count() or 1) if workers is None else workers
+
+    def run(args):
+        return _simulate_chunk(inputs, *args, factor_ranges, offsets, gsd)
+
+    if workers > 1:
+        with ThreadPoolExecutor(workers) as pool:
+            parts = list(pool.map(run, zip(sizes, seeds)))
+    else:
+        parts = [run(args) for args in zip(sizes, seeds)]
+    return np.concatenate(parts)
+
+
+def percentile_bands(samples, variants, percentiles=PERCENTILES):
+    """Variant x (Mean, P5, ...) frame of draws x variant ``samples``."""
+    bands = np.percentile(samples, percentiles, axis=0).T
+    frame = pd.DataFrame(bands, index=pd.Index(variants, name="Variant"),
+                         columns=[f"P{p}" for p in percentiles])
+    frame.insert(0, "Mean", samples.mean(axis=0))
+    return frame
+
+
+def cost_bands(df, variant_map, column_mapping, apply_adjustment=False, draws=DEFAULT_DRAWS,
+               gsd=1.0, seed=0, workers=None, rows=None):
+    """Percentile bands of each variant's total monetized cost (€)."""
+    categories = list(column_mapping)
+    columns = [column_mapping[c] for c in categories]
+    inputs = propagation_inputs(df, variant_map, columns, rows)
+    low, mode, high = np.array([MONETIZATION_FACTORS[c] for c in categories], dtype=np.float64).T
+
+    offsets = np.zeros((len(variant_map), len(columns)))
+    if apply_adjustment and CO2_CATEGORY in column_mapping:
+        j = categories.index(CO2_CATEGORY)
+        counts = pair_sums(inputs["variant_idx"], inputs["row_idx"], inputs["present"][:, [j]],
+                           inputs["variants"])[:, 0]
+        corrections = np.array([CO2_CORRECTIONS.get(rule['Fuel'], 0.0) for rule in variant_map.values()])
+        offsets[:, j] = corrections * counts
+
+    samples = simulate(inputs, draws, (low, mode, high), offsets, gsd, seed, workers)
+    return percentile_bands(samples, list(variant_map))
+
+
+def impact_bands(df, variant_map, column, draws=DEFAULT_DRAWS, gsd=1.1, seed=0, workers=None, rows=None):
+    """Percentile bands of each variant's ``column`` total under row noise."""
+    inputs = propagation_inputs(df, variant_map, [column], rows)
+    samples = simulate(inputs, draws, gsd=gsd, seed=seed, workers=workers)[:, :, 0]
+    return percentile_bands(samples, list(variant_map))
+
+
+# -----------------------
+# Cached per loaded master.xlsx snapshot
+# -----------------------
+def load_cost_bands(variant_map=None, apply_adjustment=False, draws=DEFAULT_DRAWS, gsd=1.0, seed=0,
+                    path=MASTER_PATH):
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    return load_sweep(
+        ("cost_bands", variant_key(variant_map), bool(apply_adjustment), draws, gsd, seed),
+        lambda df: cost_bands(df, variant_map, load_column_mapping(df.columns, path)["mapping"],
+                              apply_adjustment, draws, gsd, seed, rows=load_variant_rows(variant_map, path)),
+        path
+    )
+
+
+def load_impact_bands(column, variant_map=None, draws=DEFAULT_DRAWS, gsd=1.1, seed=0, path=MASTER_PATH):
+    variant_map = load_variant_map() if variant_map is None else variant_map
+    return load_sweep(
+        ("impact_bands", variant_key(variant_map), column, draws, gsd, seed),
+        lambda df: impact_bands(df, variant_map, column, draws, gsd, seed, rows=load_variant_rows(variant_map, path)),
+        path
+    )
@@ -0,0 +1,86 @@
+"""Variant registry loaded from ``variants.json``.
+
+Each variant is one fuel family plus the ``Scenario`` values whose rows it
+sums, and each fuel family has a chart colour and optionally a darker
+``label_color`` for text. Adding a pathway variant or fuel family only
+needs a new entry in the config file.
+"""
+import functools
+import json
+import os
+
+import numpy as np
+
+REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "variants.json")
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config(path):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    fuels = [fuel['name'] for fuel in config['fuels']]
+    variant_map = {}
+    for variant in config['variants']:
+        if variant['fuel'] not in fuels:
+            raise ValueError(f"Variant {variant['name']!r} uses unknown fuel {variant['fuel']!r}")
+        if variant['name'] in variant_map:
+            raise ValueError(f"Duplicate variant {variant['name']!r}")
+        variant_map[variant['name']] = {'Fuel': variant['fuel'], 'Scenario': list(variant['scenarios'])}
+    return {
+        "fuels": fuels,
+        "colors": {fuel['name']: fuel['color'] for fuel in config['fuels']},
+        "label_colors": {fuel['name']: fuel.get('label_color', fuel['color']) for fuel in config['fuels']},
+        "variants": variant_map,
+    }
+
+
+def load_registry(path=REGISTRY_PATH):
+    """Return the parsed registry. Shared between callers, do not mutate."""
+    return _load_config(os.path.abspath(path))
+
+
+def load_variant_map(path=REGISTRY_PATH):
+    return load_registry(path)["variants"]
+
+
+def fuel_families(path=REGISTRY_PATH):
+    return load_registry(path)["fuels"]
+
+
+def fuel_colors(path=REGISTRY_PATH):
+    return load_registry(path)["colors"]
+
+
+def fuel_label_colors(path=REGISTRY_PATH):
+    return load_registry(path)["label_colors"]
+
+
+def fuel_of(variant, path=REGISTRY_PATH):
+    """Fuel family of a variant name, or ``None`` if it is not registered."""
+    rule = load_registry(path)["variants"].get(variant)
+    return rule['Fuel'] if rule else None
+
+
+def fuel_sort_key(variant, path=REGISTRY_PATH):
+    """Sort variants by fuel family order, then by name; unknown names go last."""
+    fuels = fuel_families(path)
+    fuel = fuel_of(variant, path)
+    return (fuels.index(fuel) if fuel in fuels else len(fuels), variant)
+
+
+# -----------------------
+# Row index
+# -----------------------
+def variant_rows(df, variant_map):
+    """Row positions of every variant, built from one groupby pass.
+
+    ``lca.aggregation.load_variant_rows`` caches them per loaded master table.
+    """
+    pairs = df.groupby(['Fuel', 'Scenario'], sort=False).indices
+    empty = np.array([], dtype=np.intp)
+    rows = {}
+    for variant, rule in variant_map.items():
+        parts = [pairs.get((rule['Fuel'], s), empty) for s in rule['Scenario']]
+        rows[variant] = np.sort(np.concatenate(parts))
+    return rows
+
@@ -0,0 +1,101 @@
+"""Warm-up of the shared data layer when the server starts.
+
+The first script run in the process (About.py or any page) calls
+``start_warmup``, which parses master.xlsx and the scenario CSVs and builds
+the aggregates every page opens with in a background thread. Pages wait on
+it behind skeleton placeholders (``lca.skeleton``) instead of parsing in
+their own script thread, and the same loaders then return cached results.
+
+``warmup_status`` also records the cold-start time to the first chart
+rendered by any session, measured from the start of the warm-up.
+"""
+import logging
+import threading
+import time
+
+from lca.data_loader import MASTER_PATH
+from lca.scenarios import SCENARIO_FILES
+
+logger = logging.getLogger("lca.perf")
+
+_lock = threading.Lock()
+_thread = None
+_status = {"state": "idle", "started": None, "ready_s": None, "first_chart_s": None, "steps": [],
+           "total": 0, "error": None}
+
+
+def warmup_steps(master_path=MASTER_PATH, scenario_paths=SCENARIO_FILES):
+    """``(label, loader)`` pairs in the order pages first need them."""
+    # imported here, in the warm-up thread, so About.py renders before they load
+    from lca.aggregation import load_variant_counts, load_variant_totals
+    from lca.contribution import load_group_totals, load_process_groups
+    from lca.data_loader import load_master
+    from lca.heatmap import load_top_processes
+    from lca.monetization import load_column_mapping, load_monetization_cube
+    from lca.prospective import load_prospective_store
+    from lca.scenarios import load_scenario_store
+
+    scenario_paths = list(scenario_paths)
+    return [
+        ("master.xlsx", lambda: load_master(master_path)),
+        ("scenario CSVs", lambda: load_scenario_store(scenario_paths)),
+        ("variant totals", lambda: load_variant_totals(path=master_path)),
+        ("variant counts", lambda: load_variant_counts(path=master_path)),
+        ("column mapping", lambda: load_column_mapping(load_master(master_path).columns, master_path)),
+        ("monetization", lambda: load_monetization_cube(path=master_path)),
+        ("process groups", lambda: load_process_groups(master_path)),
+        ("group totals", lambda: load_group_totals(path=master_path)),
+        ("top processes", lambda: load_top_processes(path=master_path)),
+        ("prospective", lambda: load_prospective_store(scenario_paths=scenario_paths, path=master_path)),
+    ]
+
+
+def _warm(master_path, scenario_paths):
+    try:
+        steps = warmup_steps(master_path, scenario_paths)
+        with _lock:
+            _status["total"] = len(steps)
+        for label, load in steps:
+            start = time.perf_counter()
+            load()
+            with _lock:
+                _status["steps"].append({"step": label, "ms": 1000 * (time.perf_counter() - start)})
+        with _lock:
+            _status["state"] = "ready"
+            _status["ready_s"] = time.perf_counter() - _status["started"]
+    except Exception as exc:  # pages load again themselves and show the real error
+        with _lock:
+            _status["state"] = "failed"
+            _status["error"] = repr(exc)
+    logger.info("warm-up %s after %.2f s", _status["state"], time.perf_counter() - _status["started"])
+
+
+def start_warmup(master_path=MASTER_PATH, scenario_paths=SCENARIO_FILES):
+    """Start the warm-up thread once per process; later calls are no-ops."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _status.update(state="running", started=time.perf_counter())
+            _thread = threading.Thread(target=_warm, args=(master_path, tuple(scenario_paths)),
+                                       name="lca-warmup", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def warmup_status():
+    """Copy of ``{"state", "ready_s", "first_chart_s", "steps", "total", "error"}``.
+
+    ``state`` is "idle" before ``start_warmup``, then "running", "ready" or
+    "failed". Times are seconds since the warm-up started.
+    """
+    with _lock:
+        return dict(_status, steps=list(_status["steps"]))
+
+
+def record_first_chart():
+    """Note the first chart of the process; later calls are no-ops."""
+    with _lock:
+        if _status["started"] is None or _status["first_chart_s"] is not None:
+            return
+        _status["first_chart_s"] = time.perf_counter() - _status["started"]
+    logger.info("cold start: first chart after %.2f s", _status["first_chart_s"])
@@ -0,0 +1,49 @@
+"""Background file watcher for master.xlsx and the scenario CSVs.
+
+Polls file mtimes and sizes (no extra dependency) and starts the background
+reload of whatever changed, so the next rerun already finds fresh data.
+"""
+import os
+import threading
+import time
+
+from lca.data_loader import MASTER_PATH, file_fingerprint, schedule_reload
+from lca.scenarios import SCENARIO_FILES, load_scenario_store
+
+POLL_SECONDS = 2.0
+
+_lock = threading.Lock()
+_thread = None
+
+
+def _fingerprints(paths):
+    return {p: file_fingerprint(p) if os.path.exists(p) else None for p in paths}
+
+
+def _watch(master_path, scenario_paths, interval):
+    paths = [master_path, *scenario_paths]
+    seen = _fingerprints(paths)
+    while True:
+        time.sleep(interval)
+        current = _fingerprints(paths)
+        if current[master_path] != seen[master_path] and current[master_path] is not None:
+            schedule_reload(master_path)
+        if any(current[p] != seen[p] for p in scenario_paths):
+            try:
+                load_scenario_store(scenario_paths)
+            except Exception:
+                pass  # a half-written CSV is picked up again on the next change
+        seen = current
+
+
+def start_watcher(master_path=MASTER_PATH, scenario_paths=SCENARIO_FILES, interval=POLL_SECONDS):
+    """Start the polling thread once per process; later calls are no-ops."""
+    global _thread
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(
+                target=_watch, args=(master_path, tuple(scenario_paths), interval),
+                name="lca-file-watcher", daemon=True
+            )
+            _thread.start()
+        return _thread
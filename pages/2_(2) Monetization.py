@@ -1,42 +1,40 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from difflib import get_close_matches
+
+from lca.data_loader import load_master_with_hash
+from lca.debug_panel import plotly_chart, show_debug_panel, start_page_run
+from lca.factor_sets import (
+    CATEGORIES, delete_factor_set, list_factor_sets, load_set_costs, make_set, parse_factor_csv, save_factor_sets,
+)
+from lca.figure_cache import cached_figure
+from lca.monetization import (
+    CO2_CORRECTIONS, LEVELS, MONETIZATION_FACTORS, cube_costs, load_column_mapping, load_monetization_cube
+)
+from lca.sensitivity import METHODS, load_sensitivity
+from lca.skeleton import wait_for_data
+from lca.uncertainty import DEFAULT_DRAWS, load_cost_bands
+from lca.variants import load_variant_map
+from lca.warmup import start_warmup
+from lca.watcher import start_watcher
 
 st.set_page_config(
     page_title="LCA Monetization Dashboard",
     layout="wide"
 )
+start_watcher()
+start_warmup()
+start_page_run("Monetization")
+wait_for_data()
 
 def app():
     st.title("💰 LCA Fuel Variant Monetization Dashboard")
 
     # 📂 Load master.xlsx
-    df = pd.read_excel("master.xlsx", sheet_name=0)
+    df, data_hash = load_master_with_hash()
 
     # 📶 Monetization Factor Selection
-    tabs = ["Low", "Central", "High"]
-    scenario_level = st.sidebar.selectbox("Select Monetization Scenario", tabs, index=1)
-    scenario_index = {"Low": 0, "Central": 1, "High": 2}[scenario_level]
-
-    # 📦 Monetization Factors
-    monetization_factors_all = {
-        "Climate change (kg CO₂ eq.)": [0.0615, 0.1025, 0.1936],
-        "Ozone Depletion Potential (kg CFC-11 eq.)": [22.8, 31.4, 127.2],
-        "Ionising Radiation – Human Health (kBq U-235 eq.)": [0.0008, 0.00120, 0.0461],
-        "Photochemical Ozone Creation Potential (kg NMVOC eq.)": [0.87, 1.19, 1.90],
-        "Particulate Matter Formation (Disease incidence)": [661974, 784126, 1204600],
-        "Human Toxicity – Non-Carcinogenic (CTUh)": [30211, 163447, 755270],
-        "Human Toxicity – Carcinogenic (CTUh)": [174324, 902616, 2789181],
-        "Acidification (mol H⁺ eq.)": [0.176, 0.344, 1.617],
-        "Eutrophication Potential – Freshwater (kg P eq.)": [0.26, 1.92, 2.18],
-        "Eutrophication Potential – Marine (kg N eq.)": [3.21, 3.21, 3.21],
-        "Ecotoxicity – Freshwater (CTUe)": [2.39e-24, 3.82e-05, 1.89e-04],
-        "Land Use (Pt)": [0.000087, 0.000175, 0.000349],
-        "Water Use (m³ world eq.)": [0.00419, 0.00499, 0.2359],
-        "Resource Use – Fossils (MJ)": [0, 0.0013, 0.0068],
-        "Material resources: metals/minerals (kg Sb eq.)": [0, 1.64, 6.53]
-    }
+    scenario_level = st.sidebar.selectbox("Select Monetization Scenario", LEVELS, index=1)
+    scenario_index = LEVELS.index(scenario_level)
 
     color_presets = {
         "Climate change (kg CO₂ eq.)": "#ff4d4d",
@@ -54,13 +52,9 @@ def app():
         "Material resources: metals/minerals (kg Sb eq.)": "#4682b4"
     }
 
-    column_manual_overrides = {
-        "Resource Use – Fossils (MJ)": "Energy resources: non-renewable (MJ)"
-    }
-
     user_monetization_factors = {}
     custom_color_dict = {}
-    for category, values in monetization_factors_all.items():
+    for category, values in MONETIZATION_FACTORS.items():
         factor = values[scenario_index]
         color = color_presets.get(category, "#000000")
         user_monetization_factors[category] = factor
@@ -73,73 +67,52 @@ def app():
         for cat, val in user_monetization_factors.items()
     ])
 
-    fig = px.bar(
-        monetization_df,
-        x="Category",
-        y="Factor (€/unit)",
-        color="Category",
-        title=f"💶 Monetization Factors - {scenario_level} Scenario",
-        color_discrete_map=custom_color_dict
-    )
-    fig.update_layout(showlegend=False, xaxis_tickangle=-45, height=600)
-    st.plotly_chart(fig, use_container_width=True)
+    def build_factor_figure():
+        import plotly.express as px
+
+        fig = px.bar(
+            monetization_df,
+            x="Category",
+            y="Factor (€/unit)",
+            color="Category",
+            title=f"💶 Monetization Factors - {scenario_level} Scenario",
+            color_discrete_map=custom_color_dict
+        )
+        fig.update_layout(showlegend=False, xaxis_tickangle=-45, height=600)
+        return fig
 
-    column_mapping = {}
-    for key in user_monetization_factors:
-        if key in column_manual_overrides:
-            column_mapping[key] = column_manual_overrides[key]
-        else:
-            match = get_close_matches(key, df.columns, n=1, cutoff=0.6)
-            if match:
-                column_mapping[key] = match[0]
+    fig = cached_figure(("monetization_factors", scenario_level), build_factor_figure)
+    plotly_chart(fig, "monetization_factors", use_container_width=True)
 
-    matched_columns = list(column_mapping.values())
+    # 🔍 Category → column mapping, resolved once per workbook schema
+    column_match = load_column_mapping(df.columns)
+    with st.expander("🔍 Impact column mapping diagnostics"):
+        st.caption(f"Workbook schema `{column_match['schema_hash'][:12]}`")
+        st.dataframe(pd.DataFrame(column_match["details"]), use_container_width=True)
+        if column_match["unmatched"]:
+            st.warning("Not monetized (no matching column): " + ", ".join(column_match["unmatched"]))
 
-    apply_adjustment = st.sidebar.checkbox("✅ Apply CO₂ correction (-7.4kg for STL, -6.34kg for PTL)")
+    correction_text = ", ".join(f"-{kg}kg for {fuel}" for fuel, kg in CO2_CORRECTIONS.items())
+    apply_adjustment = st.sidebar.checkbox(f"✅ Apply CO₂ correction ({correction_text})")
+    # fuels whose corrected cost is marked "❌" rather than shown
+    marked_fuels = set(CO2_CORRECTIONS) if apply_adjustment else set()
 
     st.subheader("📊 Total Monetized Cost per Fuel Variant")
 
-    variant_map = {
-        'STL1': {'Fuel': 'STL', 'Scenario': [0, 1]},
-        'STL2': {'Fuel': 'STL', 'Scenario': [0, 2]},
-        'STL3': {'Fuel': 'STL', 'Scenario': [0, 3]},
-        'HEFA1': {'Fuel': 'HEFA', 'Scenario': [0, 1]},
-        'HEFA2': {'Fuel': 'HEFA', 'Scenario': [0, 2]},
-        'HEFA3': {'Fuel': 'HEFA', 'Scenario': [0, 3]},
-        'HEFA4': {'Fuel': 'HEFA', 'Scenario': [0, 4]},
-        'PBTL1': {'Fuel': 'PBTL', 'Scenario': [0, 1]},
-        'PBTL2': {'Fuel': 'PBTL', 'Scenario': [0, 2]},
-        'PBTL3': {'Fuel': 'PBTL', 'Scenario': [0, 3]},
-        'PBTL4': {'Fuel': 'PBTL', 'Scenario': [0, 4]},
-        'BTL': {'Fuel': 'BTL', 'Scenario': [0]},
-        'PTL1': {'Fuel': 'PTL', 'Scenario': [0, 1]},
-        'PTL2': {'Fuel': 'PTL', 'Scenario': [0, 2]},
-        'PTL3': {'Fuel': 'PTL', 'Scenario': [0, 3]},
-        'PTL4': {'Fuel': 'PTL', 'Scenario': [0, 4]}
-    }
+    variant_map = load_variant_map()
 
-    monetized_data = []
-    for variant, rule in variant_map.items():
-        subset = df[(df['Fuel'] == rule['Fuel']) & (df['Scenario'].isin(rule['Scenario']))].copy()
-        co2_col = column_mapping.get("Climate change (kg CO₂ eq.)")
-        if apply_adjustment and co2_col in subset.columns:
-            if rule['Fuel'] == 'STL':
-                subset[co2_col] -= 7.4
-            elif rule['Fuel'] == 'PTL':
-                subset[co2_col] -= 6.34
-
-        impact_sum = subset[matched_columns].sum()
-        total_cost = 0.0
-        for key in column_mapping:
-            col = column_mapping[key]
-            if col in impact_sum:
-                val = float(impact_sum[col])
-                total_cost += val * user_monetization_factors[key]
+    # The cube holds every level x correction combination; the sidebar only slices it
+    cost_df = cube_costs(load_monetization_cube(variant_map), scenario_level, apply_adjustment)
+    categories = list(cost_df.columns)
+    cost_matrix = cost_df.to_numpy()
+    total_costs = cost_matrix.sum(axis=1)
 
+    monetized_data = []
+    for i, (variant, rule) in enumerate(variant_map.items()):
         monetized_data.append({
             "Variant": variant,
             "Fuel": rule['Fuel'],
-            "Monetized Cost (€)": "❌" if rule['Fuel'] in ['STL', 'PTL'] and apply_adjustment else round(total_cost, 2)
+            "Monetized Cost (€)": "❌" if rule['Fuel'] in marked_fuels else round(float(total_costs[i]), 2)
         })
 
     result_df = pd.DataFrame(monetized_data)
@@ -154,63 +127,222 @@ def app():
         return name.split(" (")[0]
 
     category_cost_records = []
-    for variant, rule in variant_map.items():
-        subset = df[(df['Fuel'] == rule['Fuel']) & (df['Scenario'].isin(rule['Scenario']))].copy()
-        if apply_adjustment and co2_col in subset.columns:
-            if rule['Fuel'] == 'STL':
-                subset[co2_col] -= 7.4
-            elif rule['Fuel'] == 'PTL':
-                subset[co2_col] -= 6.34
-
-        impact_sum = subset[matched_columns].sum()
-        for category in user_monetization_factors:
-            if category in column_mapping:
-                column_name = column_mapping[category]
-                val = float(impact_sum[column_name])
-                cost = val * user_monetization_factors[category]
-                category_cost_records.append({
-                    "Variant": variant,
-                    "Fuel": rule['Fuel'],
-                    "Impact Category": category,
-                    "Cost (€)": cost,
-                    "Mark": "❌" if rule['Fuel'] in ['STL', 'PTL'] and apply_adjustment else ""
-                })
+    for i, (variant, rule) in enumerate(variant_map.items()):
+        for j, category in enumerate(categories):
+            category_cost_records.append({
+                "Variant": variant,
+                "Fuel": rule['Fuel'],
+                "Impact Category": category,
+                "Cost (€)": float(cost_matrix[i, j]),
+                "Mark": "❌" if rule['Fuel'] in marked_fuels else ""
+            })
 
     stacked_df = pd.DataFrame(category_cost_records)
     stacked_df["Label"] = stacked_df["Variant"] + stacked_df["Mark"]
 
-    preferred_order = [
-        "STL1", "STL2", "STL3",
-        "PTL1", "PTL2", "PTL3", "PTL4",
-        "PBTL1", "PBTL2", "PBTL3", "PBTL4",
-        "BTL",
-        "HEFA1", "HEFA2", "HEFA3", "HEFA4"
-    ]
+    preferred_order = list(variant_map.keys())
     if apply_adjustment:
-        preferred_order = [v + "❌" if any([v.startswith('STL'), v.startswith('PTL')]) else v for v in preferred_order]
+        preferred_order = [v + "❌" if variant_map[v]['Fuel'] in marked_fuels else v for v in preferred_order]
 
     stacked_df["Label"] = pd.Categorical(stacked_df["Label"], categories=preferred_order, ordered=True)
     stacked_df = stacked_df.sort_values("Label")
     stacked_df["Impact Category Clean"] = stacked_df["Impact Category"].apply(strip_unit)
     clean_color_dict = {strip_unit(k): v for k, v in custom_color_dict.items()}
 
-    fig = px.bar(
-        stacked_df,
-        x="Label",
-        y="Cost (€)",
-        color="Impact Category Clean",
-        title="📊 Variant-wise Monetized Cost Breakdown by Impact Category",
-        color_discrete_map=clean_color_dict,
-        height=700
-    )
-    fig.update_layout(
-        xaxis_title="Fuel Variant",
-        yaxis_title="External Cost (€/kg fuel)",
-        xaxis_tickfont=dict(size=14),
-        yaxis_tickfont=dict(size=14),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.4, xanchor="center", x=0.5)
+    def build_breakdown_figure():
+        import plotly.express as px
+
+        fig = px.bar(
+            stacked_df,
+            x="Label",
+            y="Cost (€)",
+            color="Impact Category Clean",
+            title="📊 Variant-wise Monetized Cost Breakdown by Impact Category",
+            color_discrete_map=clean_color_dict,
+            height=700
+        )
+        fig.update_layout(
+            xaxis_title="Fuel Variant",
+            yaxis_title="External Cost (€/kg fuel)",
+            xaxis_tickfont=dict(size=14),
+            yaxis_tickfont=dict(size=14),
+            legend=dict(orientation="h", yanchor="bottom", y=-0.4, xanchor="center", x=0.5)
+        )
+        return fig
+
+    fig = cached_figure(
+        ("monetization_breakdown", data_hash, scenario_level, apply_adjustment),
+        build_breakdown_figure
     )
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, "monetization_breakdown", use_container_width=True)
+
+    # -----------------------
+    # 🎲 Monte Carlo Uncertainty
+    # -----------------------
+    st.sidebar.markdown("### 🎲 Uncertainty")
+    show_uncertainty = st.sidebar.checkbox("Show Monte Carlo cost bands")
+    if show_uncertainty:
+        draws = st.sidebar.selectbox("Draws", [10_000, DEFAULT_DRAWS], index=0)
+        gsd = st.sidebar.slider("Impact value spread (geometric SD)", 1.0, 2.0, 1.0, 0.05)
+
+        st.subheader("🎲 Monetized Cost Uncertainty (Monte Carlo)")
+        st.caption(
+            "Factors drawn from triangular distributions over Low / Central / High"
+            + (f"; impact values with log-normal noise (GSD {gsd:.2f})." if gsd > 1 else ".")
+        )
+        bands = load_cost_bands(variant_map, apply_adjustment, draws, gsd).reset_index()
+        bands["Label"] = [
+            v + "❌" if variant_map[v]['Fuel'] in marked_fuels else v
+            for v in bands["Variant"]
+        ]
+
+        def build_uncertainty_figure():
+            import plotly.express as px
+
+            fig = px.scatter(
+                bands,
+                x="Label",
+                y="P50",
+                error_y=bands["P95"] - bands["P50"],
+                error_y_minus=bands["P50"] - bands["P5"],
+                title="🎲 Median and 5–95 % Band of Total Monetized Cost",
+                height=500
+            )
+            fig.update_layout(xaxis_title="Fuel Variant", yaxis_title="External Cost (€/kg fuel)")
+            return fig
+
+        fig = cached_figure(
+            ("monetization_uncertainty", data_hash, apply_adjustment, draws, gsd),
+            build_uncertainty_figure
+        )
+        plotly_chart(fig, "monetization_uncertainty", use_container_width=True)
+        st.dataframe(bands.drop(columns="Label").style.format(precision=4), use_container_width=True)
+
+    # -----------------------
+    # 🧭 Sensitivity Analysis
+    # -----------------------
+    show_sensitivity = st.sidebar.checkbox("🧭 Show factor sensitivity")
+    if show_sensitivity:
+        method = st.sidebar.radio("Sensitivity method", METHODS, horizontal=True)
+        focus_variant = st.sidebar.selectbox("Sensitivity for variant", list(variant_map.keys()))
+
+        st.subheader(f"🧭 Which Monetization Factors Drive {focus_variant}'s Cost ({method})")
+        indices = load_sensitivity(method, variant_map, apply_adjustment)
+        measures = ["ST", "S1"] if method == "Sobol" else ["mu_star", "sigma"]
+        tornado_df = (
+            indices[indices["Variant"] == focus_variant]
+            .sort_values(measures[0])
+            .melt(id_vars=["Variant", "Impact Category"], value_vars=measures, var_name="Measure", value_name="Value")
+        )
+        tornado_df["Impact Category"] = tornado_df["Impact Category"].apply(strip_unit)
+
+        def build_tornado_figure():
+            import plotly.express as px
+
+            fig = px.bar(
+                tornado_df,
+                x="Value",
+                y="Impact Category",
+                color="Measure",
+                orientation="h",
+                barmode="group",
+                title=f"🧭 {method} indices – {focus_variant}",
+                height=600
+            )
+            fig.update_layout(
+                xaxis_title="Sobol index" if method == "Sobol" else "Elementary effect (€/kg fuel)",
+                yaxis_title=None
+            )
+            return fig
+
+        fig = cached_figure(
+            ("monetization_sensitivity", data_hash, method, focus_variant, apply_adjustment),
+            build_tornado_figure
+        )
+        plotly_chart(fig, "monetization_sensitivity", use_container_width=True)
+
+    # -----------------------
+    # 🧮 Factor Set Comparison
+    # -----------------------
+    show_factor_sets = st.sidebar.checkbox("🧮 Compare factor sets")
+    if show_factor_sets:
+        st.subheader("🧮 Total Monetized Cost under Different Factor Sets")
+        factor_sets = list_factor_sets()
+
+        with st.expander("🗂️ Manage factor sets"):
+            uploaded = st.file_uploader(
+                "Upload sets (CSV with a 'Category' column and one column of €/unit factors per set)",
+                type="csv"
+            )
+            # the uploader keeps returning the file on every rerun, so import it once
+            if uploaded is not None and st.session_state.get("factor_set_upload") != uploaded.file_id:
+                st.session_state["factor_set_upload"] = uploaded.file_id
+                try:
+                    save_factor_sets(parse_factor_csv(uploaded.getvalue()))
+                    factor_sets = list_factor_sets()
+                except ValueError as e:
+                    st.error(str(e))
+
+            base_name = st.selectbox("Start a new set from", [s["name"] for s in factor_sets])
+            base = next(s for s in factor_sets if s["name"] == base_name)
+            edited = st.data_editor(
+                pd.DataFrame({
+                    "Category": CATEGORIES,
+                    "Factor (€/unit)": [base["factors"].get(c, 0.0) for c in CATEGORIES]
+                }),
+                disabled=["Category"],
+                hide_index=True,
+                use_container_width=True,
+                key=f"factor_set_editor_{base['hash'][:12]}"
+            )
+            new_name = st.text_input("Name for the edited set")
+            if st.button("💾 Save set", disabled=not new_name.strip()):
+                try:
+                    save_factor_sets([
+                        make_set(new_name.strip(), dict(zip(edited["Category"], edited["Factor (€/unit)"])))
+                    ])
+                    factor_sets = list_factor_sets()
+                except ValueError as e:
+                    st.error(str(e))
+
+            user_sets = factor_sets[len(LEVELS):]
+            if user_sets:
+                to_delete = st.selectbox("Delete a saved set", [s["name"] for s in user_sets])
+                if st.button("🗑️ Delete set"):
+                    delete_factor_set(next(s for s in user_sets if s["name"] == to_delete))
+                    factor_sets = list_factor_sets()
+
+        selected_names = st.multiselect(
+            "Sets to compare",
+            [s["name"] for s in factor_sets],
+            default=[s["name"] for s in factor_sets]
+        )
+        selected_sets = [s for s in factor_sets if s["name"] in selected_names]
+        if selected_sets:
+            set_costs = load_set_costs(selected_sets, variant_map, apply_adjustment)
+            set_df = set_costs.reset_index().melt(id_vars="Variant", var_name="Factor Set", value_name="Monetized Cost (€)")
+
+            def build_factor_set_figure():
+                import plotly.express as px
+
+                fig = px.bar(
+                    set_df,
+                    x="Variant",
+                    y="Monetized Cost (€)",
+                    color="Factor Set",
+                    barmode="group",
+                    title="🧮 Total Monetized Cost per Factor Set",
+                    height=500
+                )
+                fig.update_layout(xaxis_title="Fuel Variant", yaxis_title="External Cost (€/kg fuel)")
+                return fig
+
+            fig = cached_figure(
+                ("monetization_factor_sets", data_hash, apply_adjustment, tuple(s["name"] + s["hash"] for s in selected_sets)),
+                build_factor_set_figure
+            )
+            plotly_chart(fig, "monetization_factor_sets", use_container_width=True)
+            st.dataframe(set_costs.style.format("€{:.4f}"), use_container_width=True)
 
     st.download_button(
         label="📅 Download Result as CSV",
@@ -218,4 +350,5 @@ def app():
         file_name="fuel_variant_monetization.csv",
         mime="text/csv"
     )
-app()
\ No newline at end of file
+app()
+show_debug_panel()